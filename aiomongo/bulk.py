@@ -1,8 +1,10 @@
+import asyncio
 import struct
-from typing import Iterable, Iterator, List, Optional, Tuple
+from typing import Iterable, Iterator, List, MutableMapping, Optional, Tuple
 
-from bson import BSON, ObjectId
+from bson import BSON, ObjectId, _dict_to_bson
 from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
 from bson.son import SON
 from io import BytesIO
 from pymongo.bulk import _COMMANDS, _DELETE_ALL, _DELETE_ONE, _Run, _merge_command
@@ -10,10 +12,12 @@ from pymongo.common import (validate_is_document_type,
                             validate_is_mapping,
                             validate_ok_for_replace,
                             validate_ok_for_update)
-from pymongo.errors import BulkWriteError, InvalidOperation
+from pymongo.errors import (BulkWriteError, DuplicateKeyError,
+                            InvalidOperation, WriteConcernError, WriteError)
 from pymongo.message import (_COMMAND_OVERHEAD, _INSERT, _UPDATE, _DELETE, _BSONOBJ,
                              _ZERO_8, _ZERO_16, _ZERO_32, _ZERO_64, _SKIPLIM,
                              _OP_MAP, _raise_document_too_large)
+from pymongo.results import InsertOneResult
 from pymongo.write_concern import WriteConcern
 
 
@@ -40,6 +44,18 @@ class Bulk:
             document['_id'] = ObjectId()
         self.ops.append((_INSERT, document))
 
+    def add_inserts(self, documents: Iterable[dict]) -> None:
+        """Add several insert documents to the list of ops.
+        """
+        ops = []
+        for document in documents:
+            validate_is_document_type('document', document)
+            # Generate ObjectId client side.
+            if '_id' not in document:
+                document['_id'] = ObjectId()
+            ops.append((_INSERT, document))
+        self.ops.extend(ops)
+
     def add_update(self, selector: dict, update: dict, multi: bool = False, upsert: bool = False, collation = None) -> None:
         """Create an update document and add it to the list of ops.
         """
@@ -88,6 +104,15 @@ class Bulk:
             if run.ops:
                 yield run
 
+    def gen_single(self) -> Iterator[_Run]:
+        """Generate the only batch of operations when all of them have
+        the same type, which is the same for ordered and unordered bulks.
+        """
+        run = _Run(self.ops[0][0])
+        run.index_map = list(range(len(self.ops)))
+        run.ops = [operation for _, operation in self.ops]
+        yield run
+
     async def execute_command(self, connection: 'aiomongo.Connection', generator: Iterable[_Run],
                               write_concern: WriteConcern) -> dict:
         """Execute using write commands.
@@ -145,7 +170,9 @@ class Bulk:
         write_concern = (WriteConcern(**write_concern) if
                          write_concern else self.collection.write_concern)
 
-        if self.ordered:
+        if len({op_type for op_type, _ in self.ops}) == 1:
+            generator = self.gen_single()
+        elif self.ordered:
             generator = self.gen_ordered()
         else:
             generator = self.gen_unordered()
@@ -163,7 +190,9 @@ class Bulk:
 
         # Max BSON object size + 16k - 2 bytes for ending NUL bytes.
         # Server guarantees there is enough room: SERVER-10643.
-        max_cmd_size = connection.max_bson_size + _COMMAND_OVERHEAD
+        max_bson_size = connection.max_bson_size
+        max_cmd_size = max_bson_size + _COMMAND_OVERHEAD
+        max_write_batch_size = connection.max_write_batch_size
 
         ordered = command.get('ordered', True)
 
@@ -211,16 +240,17 @@ class Bulk:
         for doc in docs:
             has_docs = True
             key = str(idx).encode()
-            value = BSON.encode(doc, check_keys, opts)
+            # Not BSON.encode: wrapping in the BSON class copies the bytes.
+            value = _dict_to_bson(doc, check_keys, opts)
 
             # Send a batch?
             enough_data = (buf.tell() + len(key) + len(value) + 2) >= max_cmd_size
-            enough_documents = (idx >= connection.max_write_batch_size)
+            enough_documents = (idx >= max_write_batch_size)
             if enough_data or enough_documents:
                 if not idx:
                     write_op = 'insert' if operation == _INSERT else None
                     _raise_document_too_large(
-                        write_op, len(value), connection.max_bson_size)
+                        write_op, len(value), max_bson_size)
                 result = await self._send_message(connection, buf, command_start, list_start)
                 results.append((idx_offset, result))
                 if ordered and 'writeErrors' in result:
@@ -404,6 +434,16 @@ class BulkOperationBuilder:
         """
         self.__bulk.add_insert(document)
 
+    def insert_many(self, documents: Iterable[dict]) -> None:
+        """Insert several documents.
+
+        :Parameters:
+          - `documents`: an iterable of documents to insert
+
+        .. seealso:: :ref:`writes-and-ids`
+        """
+        self.__bulk.add_inserts(documents)
+
     async def execute(self, write_concern: Optional[dict] = None) -> dict:
         """Execute all provided operations.
 
@@ -414,3 +454,91 @@ class BulkOperationBuilder:
         if write_concern is not None:
             validate_is_mapping('write_concern', write_concern)
         return await self.__bulk.execute(write_concern)
+
+
+class InsertBatcher:
+    """Combines single-document inserts into unordered insert commands.
+
+    Documents added before the event loop next runs its callbacks are sent
+    together, up to `max_batch_size` at a time.
+    """
+
+    def __init__(self, collection: 'aiomongo.Collection', max_batch_size: int = 1000):
+        self.collection = collection
+        self.max_batch_size = max_batch_size
+        self.loop = collection.database.client.loop
+        self.max_bson_size = None
+        self.pending = []
+
+    async def insert(self, document: MutableMapping) -> InsertOneResult:
+        """Queue `document` and wait for the batch containing it.
+        """
+        validate_is_document_type('document', document)
+        is_raw_bson = isinstance(document, RawBSONDocument)
+        if is_raw_bson:
+            encoded = document
+        else:
+            if '_id' not in document:
+                document['_id'] = ObjectId()
+            # Encode now, so that invalid keys fail only this caller, and
+            # queue the encoded document so it isn't encoded twice.
+            encoded = RawBSONDocument(_dict_to_bson(
+                document, True, self.collection.codec_options))
+
+        if self.max_bson_size is None:
+            connection = await self.collection.database.client.get_connection()
+            self.max_bson_size = connection.max_bson_size
+        if len(encoded.raw) > self.max_bson_size:
+            # Sent in a batch it would abort the documents queued after it.
+            return await self.collection.insert_one(document)
+
+        future = self.loop.create_future()
+        self.pending.append((encoded, future))
+        if len(self.pending) >= self.max_batch_size:
+            self.flush()
+        elif len(self.pending) == 1:
+            self.loop.call_soon(self.flush)
+
+        await future
+        return InsertOneResult(None if is_raw_bson else document['_id'], True)
+
+    def flush(self) -> None:
+        """Start sending the queued documents.
+        """
+        if self.pending:
+            pending, self.pending = self.pending, []
+            asyncio.ensure_future(self._send(pending), loop=self.loop)
+
+    async def _send(self, pending: List[Tuple[MutableMapping, asyncio.Future]]) -> None:
+        bulk = Bulk(self.collection, False, False)
+        bulk.ops = [(_INSERT, document) for document, _ in pending]
+        try:
+            await bulk.execute(None)
+        except BulkWriteError as exc:
+            errors = {error['index']: error
+                      for error in exc.details['writeErrors']}
+            for idx, (_, future) in enumerate(pending):
+                if future.done():
+                    continue
+                error = errors.get(idx)
+                if error is not None:
+                    error_class = (DuplicateKeyError if error['code'] == 11000
+                                   else WriteError)
+                    future.set_exception(error_class(
+                        error.get('errmsg'), error['code'], error))
+                elif exc.details['writeConcernErrors']:
+                    # Write concern errors apply to every document.
+                    wc_error = exc.details['writeConcernErrors'][-1]
+                    future.set_exception(WriteConcernError(
+                        wc_error.get('errmsg'), wc_error.get('code'),
+                        wc_error))
+                else:
+                    future.set_result(None)
+        except Exception as exc:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(exc)
+        else:
+            for _, future in pending:
+                if not future.done():
+                    future.set_result(None)
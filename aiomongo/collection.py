@@ -20,7 +20,7 @@ from pymongo.results import (BulkWriteResult,
 from pymongo.write_concern import WriteConcern
 
 import aiomongo
-from .bulk import Bulk, BulkOperationBuilder
+from .bulk import Bulk, BulkOperationBuilder, InsertBatcher
 from .command_cursor import CommandCursor
 from .cursor import Cursor
 
@@ -54,6 +54,7 @@ class Collection:
         self.__write_response_codec_options = self.codec_options._replace(
             unicode_decode_error_handler='replace',
             document_class=dict)
+        self.__insert_batcher = None
 
     def __str__(self) -> str:
         return '{}.{}'.format(self.database.name, self.name)
@@ -570,6 +571,31 @@ class Collection:
 
         return InsertOneResult(document_id, acknowledged)
 
+    async def insert_one_batched(self, document: MutableMapping) -> InsertOneResult:
+        """Insert a single document, sharing the round trip with other
+        documents inserted this way.
+
+        Documents passed to this method on this :class:`Collection` instance
+        before the event loop next runs its callbacks are sent together in
+        one unordered insert command, up to 1000 at a time. Errors are
+        raised for the documents they concern, as :meth:`insert_one` would
+        raise them.
+
+        With an unacknowledged write concern this is the same as
+        :meth:`insert_one`.
+
+        :Parameters:
+          - `document`: The document to insert. Must be a mutable mapping
+            type. If the document does not have an _id field one will be
+            added automatically.
+        """
+        if not self.write_concern.acknowledged:
+            return await self.insert_one(document)
+
+        if self.__insert_batcher is None:
+            self.__insert_batcher = InsertBatcher(self)
+        return await self.__insert_batcher.insert(document)
+
     async def insert_many(self, documents: Iterable[dict], ordered: bool = True,
                           bypass_document_validation: bool = False) -> InsertManyResult:
 
@@ -1,19 +1,29 @@
+import asyncio
 import datetime
 import math
 from hashlib import md5
 from io import BytesIO
 from os import SEEK_SET, SEEK_CUR, SEEK_END
-from typing import BinaryIO, List, Union
+from typing import BinaryIO, List, Optional, Union
 
 from bson import ObjectId
-from bson.binary import Binary
 from gridfs.errors import CorruptGridFile, FileExists, NoFile
 from gridfs.grid_file import _C_INDEX, _F_INDEX, DEFAULT_CHUNK_SIZE, EMPTY, NEWLN
 from pymongo import ReadPreference
-from pymongo.errors import ConfigurationError, DuplicateKeyError, OperationFailure
+from pymongo.errors import (BulkWriteError, ConfigurationError,
+                            DuplicateKeyError, OperationFailure)
 
 from aiomongo.cursor import Cursor
 
+# Default number of chunk bytes requested per batch when reading a file, and
+# the most chunk bytes sent per insert when writing one.
+_CHUNK_BATCH_BYTES = 4 * 1024 * 1024
+
+# Default batch size when listing files. files documents are small, and a
+# first batch larger than the server's default of 101 saves a getMore on
+# listings of up to this many files.
+_FILES_BATCH_SIZE = 1000
+
 
 def _grid_in_property(field_name, docstring, read_only=False,
                       closed_only=False):
@@ -45,8 +55,51 @@ def _grid_in_property(field_name, docstring, read_only=False,
     return property(getter, doc=docstring)
 
 
+def _view_reader(data: bytes):
+    """Return a ``read(size)`` function over `data` which returns
+    :class:`memoryview` slices instead of copies.
+    """
+    view = memoryview(data)
+    position = 0
+
+    def read(size):
+        nonlocal position
+        chunk = view[position:position + size]
+        position += len(chunk)
+        return chunk
+
+    return read
+
+
+def _hashing_reader(read, md5_hash):
+    """Wrap `read` so that all data it returns is fed to `md5_hash`.
+    """
+    def hashing_read(size):
+        data = read(size)
+        md5_hash.update(data)
+        return data
+
+    return hashing_read
+
+
 class GridIn:
-    def __init__(self, root_collection: 'aiomongo.Collection', **kwargs):
+    def __init__(self, root_collection: 'aiomongo.Collection',
+                 disable_md5: bool = False, ensured_index: bool = False,
+                 **kwargs):
+        """Write a file to GridFS.
+
+        :Parameters:
+          - `root_collection`: root collection to write to
+          - `disable_md5` (optional): When True, an MD5 checksum will not be
+            computed for the uploaded file. Useful in environments where
+            MD5 cannot be used for regulatory or other reasons. Defaults to
+            False.
+          - `ensured_index` (optional): When True, the indexes on the
+            ``files`` and ``chunks`` collections are known to exist and
+            are not checked before the first chunk is written. Defaults to
+            False.
+          - `**kwargs` (optional): file level options (see above)
+        """
         # With w=0, 'filemd5' might run before the final chunks are written.
         if not root_collection.write_concern.acknowledged:
             raise ConfigurationError('root_collection must use '
@@ -61,7 +114,8 @@ class GridIn:
         coll = root_collection.with_options(
             read_preference=ReadPreference.PRIMARY)
 
-        kwargs['md5'] = md5()
+        if not disable_md5:
+            kwargs['md5'] = md5()
         # Defaults
         kwargs['_id'] = kwargs.get('_id', ObjectId())
         kwargs['chunkSize'] = kwargs.get('chunkSize', DEFAULT_CHUNK_SIZE)
@@ -72,7 +126,8 @@ class GridIn:
         object.__setattr__(self, '_position', 0)
         object.__setattr__(self, '_chunk_number', 0)
         object.__setattr__(self, '_closed', False)
-        object.__setattr__(self, '_ensured_index', False)
+        object.__setattr__(self, '_disable_md5', disable_md5)
+        object.__setattr__(self, '_ensured_index', ensured_index)
 
     async def __create_index(self, collection, index_key, unique):
         doc = await collection.find_one(projection={'_id': 1})
@@ -148,7 +203,6 @@ class GridIn:
         # Ensure the index, even if there's nothing to write, so
         # the filemd5 command always succeeds.
         await self.__ensure_indexes()
-        self._file['md5'].update(data)
 
         if not data:
             return
@@ -156,7 +210,9 @@ class GridIn:
 
         chunk = {'files_id': self._file['_id'],
                  'n': self._chunk_number,
-                 'data': Binary(data)}
+                 # bytes encode as binary subtype 0; bytes() is a no-op
+                 # for bytes and the only copy for a memoryview.
+                 'data': bytes(data)}
 
         try:
             await self._chunks.insert_one(chunk)
@@ -165,6 +221,27 @@ class GridIn:
         self._chunk_number += 1
         self._position += len(data)
 
+    async def __flush_chunks(self, chunks):
+        """Flush several full chunks with a single insert.
+        """
+        await self.__ensure_indexes()
+
+        documents = []
+        for data in chunks:
+            documents.append({'files_id': self._file['_id'],
+                              'n': self._chunk_number + len(documents),
+                              'data': bytes(data)})
+
+        try:
+            await self._chunks.insert_many(documents)
+        except BulkWriteError as exc:
+            if any(error['code'] == 11000
+                   for error in exc.details['writeErrors']):
+                self._raise_file_exists(self._file['_id'])
+            raise
+        self._chunk_number += len(documents)
+        self._position += sum(len(data) for data in chunks)
+
     async def __flush_buffer(self):
         """Flush the buffer contents out to a chunk.
         """
@@ -178,7 +255,8 @@ class GridIn:
         try:
             await self.__flush_buffer()
 
-            self._file['md5'] = self._file['md5'].hexdigest()
+            if not self._disable_md5:
+                self._file['md5'] = self._file['md5'].hexdigest()
             self._file['length'] = self._position
             self._file['uploadDate'] = datetime.datetime.utcnow()
 
@@ -238,7 +316,13 @@ class GridIn:
                 except AttributeError:
                     raise TypeError('must specify an encoding for file in '
                                     'order to write %s' % (str.__name__,))
-            read = BytesIO(data).read
+            if not self._disable_md5:
+                # Hash the whole input at once rather than chunk by chunk.
+                self._file['md5'].update(data)
+            read = _view_reader(data)
+        else:
+            if not self._disable_md5:
+                read = _hashing_reader(read, self._file['md5'])
 
         if self._buffer.tell() > 0:
             # Make sure to flush only when _buffer is complete
@@ -253,10 +337,21 @@ class GridIn:
                 if len(to_write) < space:
                     return  # EOF or incomplete
             await self.__flush_buffer()
+        # Full chunks are sent in batches of about _CHUNK_BATCH_BYTES, all
+        # of them before returning.
+        pending = []
+        pending_size = 0
         to_write = read(self.chunk_size)
         while to_write and len(to_write) == self.chunk_size:
-            await self.__flush_data(to_write)
+            pending.append(to_write)
+            pending_size += len(to_write)
+            if pending_size >= _CHUNK_BATCH_BYTES:
+                await self.__flush_chunks(pending)
+                pending = []
+                pending_size = 0
             to_write = read(self.chunk_size)
+        if pending:
+            await self.__flush_chunks(pending)
         self._buffer.write(to_write)
 
     async def writelines(self, sequence: List[Union[bytes, str]]) -> None:
@@ -293,12 +388,17 @@ def _grid_out_property(field_name, docstring):
 
 
 class GridOut:
-    def __init__(self, root_collection: 'aiomongo.Collection', file_id=None, file_document=None):
+    def __init__(self, root_collection: 'aiomongo.Collection', file_id=None, file_document=None,
+                 prefetch: bool = False, batch_size: Optional[int] = None):
+        self.__root_collection = root_collection
         self.__chunks = root_collection.chunks
         self.__files = root_collection.files
         self.__file_id = file_id
         self.__buffer = EMPTY
         self.__position = 0
+        self.__prefetch = prefetch
+        self.__batch_size = batch_size
+        self.__chunk_iter = None
         self._file = file_document
 
     _id = _grid_out_property('_id', "The ``'_id'`` value for this file.")
@@ -326,6 +426,16 @@ class GridOut:
             return self._file[name]
         raise AttributeError("GridOut object has no attribute '%s'" % name)
 
+    def clone(self) -> 'GridOut':
+        """Get a new :class:`GridOut` for the same file, positioned at the
+        start.
+
+        The file document already loaded by this instance is reused, so
+        no query is made for it.
+        """
+        return GridOut(self.__root_collection, self.__file_id, self._file,
+                       self.__prefetch, self.__batch_size)
+
     async def readchunk(self):
         """Reads a chunk at a time. If the current position is within a
         chunk the remainder of the chunk is returned.
@@ -338,11 +448,14 @@ class GridOut:
             chunk_data = self.__buffer
         elif self.__position < int(self.length):
             chunk_number = int((received + self.__position) / chunk_size)
-            chunk = await self.__chunks.find_one({'files_id': self._id,
-                                                 'n': chunk_number})
-            if not chunk:
-                raise CorruptGridFile('no chunk #%d' % chunk_number)
-
+            if (self.__chunk_iter is None or
+                    self.__chunk_iter.next_chunk != chunk_number):
+                self.__close_chunk_iter()
+                self.__chunk_iter = _GridOutChunkIterator(
+                    self, self.__chunks, chunk_number, self.__prefetch,
+                    self.__batch_size)
+
+            chunk = await self.__chunk_iter.next()
             chunk_data = chunk['data'][self.__position % chunk_size:]
 
             if not chunk_data:
@@ -372,11 +485,11 @@ class GridOut:
             size = remainder
 
         received = 0
-        data = BytesIO()
+        parts = []
         while received < size:
             chunk_data = await self.readchunk()
             received += len(chunk_data)
-            data.write(chunk_data)
+            parts.append(chunk_data)
 
         # Detect extra chunks.
         max_chunk_n = math.ceil(self.length / float(self.chunk_size))
@@ -390,11 +503,11 @@ class GridOut:
 
         self.__position -= received - size
 
-        # Return 'size' bytes and store the rest.
-        data.seek(size)
-        self.__buffer = data.read()
-        data.seek(0)
-        return data.read(size)
+        # Return 'size' bytes and store the rest. Slicing all of a bytes
+        # object returns it without a copy.
+        data = b''.join(parts)
+        self.__buffer = data[size:]
+        return data[:size]
 
     async def readline(self, size=-1):
         """Read one line or up to `size` bytes from the file.
@@ -410,7 +523,7 @@ class GridOut:
             size = remainder
 
         received = 0
-        data = BytesIO()
+        parts = []
         while received < size:
             chunk_data = await self.readchunk()
             pos = chunk_data.find(NEWLN, 0, size)
@@ -418,17 +531,17 @@ class GridOut:
                 size = received + pos + 1
 
             received += len(chunk_data)
-            data.write(chunk_data)
+            parts.append(chunk_data)
             if pos != -1:
                 break
 
         self.__position -= received - size
 
-        # Return 'size' bytes and store the rest.
-        data.seek(size)
-        self.__buffer = data.read()
-        data.seek(0)
-        return data.read(size)
+        # Return 'size' bytes and store the rest. Slicing all of a bytes
+        # object returns it without a copy.
+        data = b''.join(parts)
+        self.__buffer = data[size:]
+        return data[:size]
 
     def tell(self):
         """Return the current position of this file.
@@ -470,11 +583,21 @@ class GridOut:
         useful when serving files using a webserver that handles
         such an iterator efficiently.
         """
-        return GridOutIterator(self, self.__chunks)
+        return GridOutIterator(self, self.__chunks, self.__prefetch,
+                               self.__batch_size)
+
+    def __close_chunk_iter(self):
+        if self.__chunk_iter is not None:
+            self.__chunk_iter.close()
+            self.__chunk_iter = None
 
     def close(self):
-        """Make GridOut more generically file-like."""
-        pass
+        """Make GridOut more generically file-like.
+
+        Releases the cursor used to read chunks, including any batch
+        being prefetched.
+        """
+        self.__close_chunk_iter()
 
     async def __aenter__(self) -> 'GridOut':
         """Makes it possible to use :class:`GridOut` files
@@ -483,14 +606,97 @@ class GridOut:
         return self
 
     async def __aexit__(self, *exc) -> None:
-        pass
+        self.close()
 
 
-class GridOutIterator:
-    def __init__(self, grid_out, chunks):
+class _GridOutChunkIterator:
+    """Iterates over a file's chunks, in order, with a single cursor.
+
+    With `prefetch`, the next batch of chunks is requested as soon as
+    the last buffered chunk has been handed out, so the round trip
+    overlaps with the caller's processing of that chunk. Unless
+    `batch_size` is given, each batch holds about
+    ``_CHUNK_BATCH_BYTES`` of chunk data.
+    """
+    def __init__(self, grid_out, chunks, next_chunk=0, prefetch=False,
+                 batch_size=None):
         self.__id = grid_out._id
         self.__chunks = chunks
-        self.__current_chunk = 0
+        self.__loop = chunks.database.client.loop
+        self.__next_chunk = next_chunk
+        self.__num_chunks = math.ceil(float(grid_out.length) /
+                                      grid_out.chunk_size)
+        self.__prefetch = prefetch
+        if batch_size is None:
+            batch_size = max(1, _CHUNK_BATCH_BYTES // int(grid_out.chunk_size))
+        self.__batch_size = batch_size
+        self.__cursor = None
+        self.__received = 0
+        self.__pending = None
+
+    @property
+    def next_chunk(self) -> int:
+        """The number of the chunk :meth:`next` will return."""
+        return self.__next_chunk
+
+    def __create_cursor(self):
+        filter = {'files_id': self.__id}
+        if self.__next_chunk > 0:
+            filter['n'] = {'$gte': self.__next_chunk}
+        self.__cursor = self.__chunks.find(filter, sort=[('n', 1)],
+                                           batch_size=self.__batch_size)
+        self.__received = 0
+
+    async def next(self) -> dict:
+        if self.__cursor is None:
+            self.__create_cursor()
+        if self.__pending is not None:
+            pending, self.__pending = self.__pending, None
+            await pending
+
+        try:
+            chunk = await self.__cursor.__anext__()
+        except StopAsyncIteration:
+            chunk = None
+        if not chunk or chunk['n'] != self.__next_chunk:
+            self.close()
+            raise CorruptGridFile('no chunk #%d' % self.__next_chunk)
+
+        self.__received += 1
+        self.__next_chunk += 1
+        if self.__next_chunk >= self.__num_chunks:
+            # Don't leave the server cursor open once the file is read.
+            self.close()
+            return chunk
+        if self.__prefetch and self.__received == self.__cursor.retrieved:
+            self.__pending = asyncio.ensure_future(self.__cursor._refresh(),
+                                                   loop=self.__loop)
+        return chunk
+
+    @staticmethod
+    async def __close_cursor(cursor, pending):
+        if pending is not None:
+            try:
+                await pending
+            except Exception:
+                pass
+        await cursor.close()
+
+    def close(self):
+        """Close the cursor, once any batch in flight has arrived."""
+        if self.__cursor is not None:
+            asyncio.ensure_future(
+                self.__close_cursor(self.__cursor, self.__pending),
+                loop=self.__loop)
+            self.__cursor = None
+            self.__pending = None
+
+
+class GridOutIterator:
+    def __init__(self, grid_out, chunks, prefetch=False, batch_size=None):
+        self.__chunk_iter = _GridOutChunkIterator(grid_out, chunks,
+                                                  prefetch=prefetch,
+                                                  batch_size=batch_size)
         self.__max_chunk = math.ceil(float(grid_out.length) /
                                      grid_out.chunk_size)
 
@@ -498,13 +704,10 @@ class GridOutIterator:
         return self
 
     async def __anext__(self):
-        if self.__current_chunk >= self.__max_chunk:
+        if self.__chunk_iter.next_chunk >= self.__max_chunk:
+            self.__chunk_iter.close()
             raise StopAsyncIteration
-        chunk = await self.__chunks.find_one({'files_id': self.__id,
-                                              'n': self.__current_chunk})
-        if not chunk:
-            raise CorruptGridFile('no chunk #%d' % self.__current_chunk)
-        self.__current_chunk += 1
+        chunk = await self.__chunk_iter.next()
         return bytes(chunk['data'])
 
 
@@ -513,7 +716,8 @@ class GridOutCursor(Cursor):
     of an arbitrary query against the GridFS files collection.
     """
     def __init__(self, collection, filter=None, skip=0, limit=0,
-                 no_cursor_timeout=False, sort=None, batch_size=0):
+                 no_cursor_timeout=False, sort=None,
+                 batch_size=_FILES_BATCH_SIZE, prefetch=True):
         """Create a new cursor, similar to the normal
         :class:`~pymongo.cursor.Cursor`.
 
@@ -526,6 +730,7 @@ class GridOutCursor(Cursor):
         """
         # Hold on to the base "fs" collection to create GridOut objects later.
         self.__root_collection = collection
+        self.__prefetch = prefetch
 
         super(GridOutCursor, self).__init__(
             collection.files, filter, skip=skip, limit=limit,
@@ -537,7 +742,8 @@ class GridOutCursor(Cursor):
         """
         # Work around "super is not iterable" issue in Python 3.x
         next_file = await super(GridOutCursor, self).__anext__()
-        return GridOut(self.__root_collection, file_document=next_file)
+        return GridOut(self.__root_collection, file_document=next_file,
+                       prefetch=self.__prefetch)
 
     def add_option(self, *args, **kwargs):
         raise NotImplementedError("Method does not exist for GridOutCursor")
@@ -548,4 +754,4 @@ class GridOutCursor(Cursor):
     def _clone_base(self) -> 'GridOutCursor':
         """Creates an empty GridOutCursor for information to be copied into.
         """
-        return GridOutCursor(self.__root_collection)
+        return GridOutCursor(self.__root_collection, prefetch=self.__prefetch)
@@ -1,23 +1,109 @@
-from collections import Mapping
+import asyncio
+from collections import Mapping, OrderedDict
 from typing import Any, BinaryIO, List, Optional, Union
 
-from gridfs.errors import NoFile
+from gridfs.errors import CorruptGridFile, NoFile
 from pymongo import ASCENDING, DESCENDING
 from pymongo.errors import ConfigurationError
+from pymongo.write_concern import WriteConcern
 
+from .command_cursor import CommandCursor
 from .grid_file import GridIn, GridOut, GridOutCursor
 
+# Tuples, so the shared specs can't be changed by a caller; sort accepts
+# any sequence of (key, direction) pairs.
+_SORT_ASCENDING = (('uploadDate', ASCENDING),)
+_SORT_DESCENDING = (('uploadDate', DESCENDING),)
+_SORT_CHUNKS = (('n', ASCENDING),)
+
+
+class _FilenameCursor:
+    """Iterates over the filenames produced by :meth:`GridFS.iter_filenames`.
+    """
+    __slots__ = ('__cursor',)
+
+    def __init__(self, cursor: CommandCursor):
+        self.__cursor = cursor
+
+    async def close(self) -> None:
+        await self.__cursor.close()
+
+    def __aiter__(self) -> '_FilenameCursor':
+        return self
+
+    async def __anext__(self) -> str:
+        return (await self.__cursor.__anext__())['_id']
+
+    async def __aenter__(self) -> '_FilenameCursor':
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
 
 class GridFS:
-    def __init__(self, database: 'aiomongo.Database', collection: str = 'fs'):
+    __slots__ = ('__collection', '__files', '__chunks', '__cache_size',
+                 '__file_cache', '__disable_md5', '__ensured_index')
+
+    def __init__(self, database: 'aiomongo.Database', collection: str = 'fs',
+                 cache_size: int = 0, disable_md5: bool = False):
+        """Create a new instance of :class:`GridFS`.
+
+        The indexes GridFS needs are checked until an upload through this
+        instance succeeds, and not again afterwards. Create a new instance
+        after dropping the ``files`` or ``chunks`` collection.
+
+        :Parameters:
+          - `database`: database to use
+          - `collection` (optional): root collection to use
+          - `cache_size` (optional): number of ``files`` documents to keep
+            in a least recently used cache for :meth:`get`. Files deleted
+            through this instance are evicted; changes made elsewhere are
+            not seen. ``0`` (the default) disables the cache.
+          - `disable_md5` (optional): When True, MD5 checksums will not be
+            computed for uploaded files. Defaults to False.
+        """
         if not database.write_concern.acknowledged:
             raise ConfigurationError('database must use '
                                      'acknowledged write_concern')
 
-        self.__database = database
         self.__collection = database[collection]
         self.__files = self.__collection.files
         self.__chunks = self.__collection.chunks
+        self.__cache_size = cache_size
+        self.__file_cache = OrderedDict()
+        self.__disable_md5 = disable_md5
+        self.__ensured_index = False
+
+    def __cache_get(self, file_id: Any) -> Optional[dict]:
+        try:
+            doc = self.__file_cache.get(file_id)
+        except TypeError:
+            # Unhashable _id, never cached.
+            return None
+        if doc is not None:
+            self.__file_cache.move_to_end(file_id)
+        return doc
+
+    def __cache_put(self, file_id: Any, doc: dict) -> None:
+        try:
+            self.__file_cache[file_id] = doc
+        except TypeError:
+            return
+        if len(self.__file_cache) > self.__cache_size:
+            self.__file_cache.popitem(last=False)
+
+    def __cache_evict(self, file_ids: List[Any]) -> None:
+        for file_id in file_ids:
+            try:
+                self.__file_cache.pop(file_id, None)
+            except TypeError:
+                pass
+
+    def __new_grid_in(self, kwargs: dict) -> GridIn:
+        # Once a file has been put, the indexes exist; skip checking again.
+        return GridIn(self.__collection, disable_md5=self.__disable_md5,
+                      ensured_index=self.__ensured_index, **kwargs)
 
     async def new_file(self, **kwargs):
         """Create a new file in GridFS.
@@ -35,7 +121,7 @@ class GridFS:
         """
         # No need for __ensure_index_files_id() here; GridIn ensures
         # the (files_id, n) index when needed.
-        return GridIn(self.__collection, **kwargs)
+        return self.__new_grid_in(kwargs)
 
     async def put(self, data: Union[bytes, str, BinaryIO], **kwargs) -> GridIn:
         """Put data in GridFS as a new file.
@@ -65,15 +151,67 @@ class GridFS:
           - `data`: data to be written as a file.
           - `**kwargs` (optional): keyword arguments for file creation
         """
-        grid_file = GridIn(self.__collection, **kwargs)
+        grid_file = self.__new_grid_in(kwargs)
         try:
-            await grid_file.write(data)
-        finally:
-            await grid_file.close()
+            try:
+                await grid_file.write(data)
+            finally:
+                await grid_file.close()
+        except Exception:
+            # The indexes may be the cause; check them again next time.
+            self.__ensured_index = False
+            raise
+
+        self.__ensured_index = True
+        return grid_file._id
+
+    async def put_stream(self, stream: Any, **kwargs) -> Any:
+        """Put data read from an asynchronous stream in GridFS as a new file.
 
+        `stream` must provide a coroutine :meth:`read` method taking the
+        maximum number of bytes to return, such as
+        :class:`asyncio.StreamReader`. While a chunk is being written to
+        the database the next one is read from `stream`, so uploads from
+        slow sources don't wait on both in turn. Any keyword arguments
+        will be passed through to the created file - see
+        :meth:`~gridfs.grid_file.GridIn` for possible arguments. Returns
+        the ``"_id"`` of the created file.
+
+        :Parameters:
+          - `stream`: asynchronous stream to read the file data from.
+          - `**kwargs` (optional): keyword arguments for file creation
+        """
+        grid_file = self.__new_grid_in(kwargs)
+        loop = self.__collection.database.client.loop
+        pending = None
+        try:
+            try:
+                while True:
+                    data = await stream.read(grid_file.chunk_size)
+                    if pending is not None:
+                        task, pending = pending, None
+                        await task
+                    if not data:
+                        break
+                    pending = asyncio.ensure_future(grid_file.write(data),
+                                                    loop=loop)
+            finally:
+                if pending is not None:
+                    # Retrieve its exception too, so a failed write isn't
+                    # logged as never retrieved.
+                    await asyncio.gather(pending, return_exceptions=True,
+                                         loop=loop)
+                await grid_file.close()
+        except Exception:
+            # The indexes may be the cause; check them again next time.
+            self.__ensured_index = False
+            raise
+
+        self.__ensured_index = True
         return grid_file._id
 
-    async def get(self, file_id: Any) -> GridOut:
+    async def get(self, file_id: Any, prefetch: bool = True,
+                  batch_size: Optional[int] = None) -> GridOut:
         """Get a file from GridFS by ``"_id"``.
 
         Returns an instance of :class:`~gridfs.grid_file.GridOut`,
@@ -81,13 +219,74 @@ class GridFS:
 
         :Parameters:
           - `file_id`: ``"_id"`` of the file to get
+          - `prefetch` (optional): if True (the default), request the
+            next batch of chunks while the current one is being read
+          - `batch_size` (optional): the number of chunks to fetch per
+            batch; by default about 4MB of chunks are fetched at a time
         """
-        gout = GridOut(self.__collection, file_id)
+        if self.__cache_size:
+            doc = self.__cache_get(file_id)
+            if doc is not None:
+                return GridOut(self.__collection, file_document=doc,
+                               prefetch=prefetch, batch_size=batch_size)
+
+        gout = GridOut(self.__collection, file_id, prefetch=prefetch,
+                       batch_size=batch_size)
 
         # Raise NoFile now, instead of on first attribute access.
         await gout._ensure_file()
+        if self.__cache_size:
+            self.__cache_put(file_id, gout._file)
         return gout
 
+    async def read_file(self, file_id: Any) -> bytes:
+        """Read the whole contents of a file from GridFS by ``"_id"``.
+
+        The ``files`` document and the chunks are requested concurrently,
+        which suits small files; use :meth:`get` to stream large ones.
+        Raises :class:`~gridfs.errors.NoFile` if there is no such file and
+        :class:`~gridfs.errors.CorruptGridFile` if its chunks do not match
+        the ``files`` document.
+
+        :Parameters:
+          - `file_id`: ``"_id"`` of the file to read
+        """
+        doc, chunks = await asyncio.gather(
+            self.__files.find_one({'_id': file_id}),
+            self.__chunks.find({'files_id': file_id},
+                               sort=_SORT_CHUNKS).to_list(),
+            loop=self.__collection.database.client.loop)
+        if doc is None:
+            raise NoFile('no file in gridfs collection %r with _id %r' %
+                         (self.__files, file_id))
+
+        length = doc.get('length', 0)
+        chunk_size = doc['chunkSize']
+        num_chunks = -(-length // chunk_size)
+
+        parts = []
+        for n, chunk in enumerate(chunks):
+            data = chunk['data']
+            if n >= num_chunks:
+                # According to spec, ignore extra chunks if they are empty.
+                if len(data):
+                    raise CorruptGridFile(
+                        'Extra chunk found: expected %i chunks but found '
+                        'chunk with n=%i' % (num_chunks, chunk['n']))
+                continue
+            if chunk['n'] != n:
+                raise CorruptGridFile('no chunk #%d' % n)
+            expected = min(chunk_size, length - n * chunk_size)
+            if len(data) != expected:
+                raise CorruptGridFile(
+                    'truncated chunk #%d: expected chunk length to be %d but '
+                    'found chunk with length %d' % (n, expected, len(data)))
+            parts.append(data)
+
+        if len(parts) < num_chunks:
+            raise CorruptGridFile('no chunk #%d' % len(parts))
+        return b''.join(parts)
+
     async def get_version(self, filename=None, version=-1, **kwargs) -> GridOut:
         """Get a file from GridFS by ``"filename"`` or metadata fields.
 
@@ -115,19 +314,32 @@ class GridFS:
             to -1, the most recent version uploaded)
           - `**kwargs` (optional): find files by custom metadata.
         """
-        query = kwargs
+        query = dict(kwargs)
         if filename is not None:
             query['filename'] = filename
 
-        cursor = self.__files.find(query)
+        # The newest and oldest versions are the common case; fetch them
+        # with a single sorted find_one instead of a skipping cursor.
+        if version == -1 or version == 0:
+            sort = _SORT_DESCENDING if version == -1 else _SORT_ASCENDING
+            grid_file = await self.__files.find_one(query, sort=sort)
+            if grid_file is None:
+                raise NoFile('no version %d for filename %r' % (version, filename))
+            return GridOut(self.__collection, file_document=grid_file,
+                           prefetch=True)
+
         if version < 0:
             skip = abs(version) - 1
-            cursor.limit(-1).skip(skip).sort('uploadDate', DESCENDING)
+            sort = _SORT_DESCENDING
         else:
-            cursor.limit(-1).skip(version).sort('uploadDate', ASCENDING)
-        async for grid_file in cursor:
-            return GridOut(self.__collection, file_document=grid_file)
-        raise NoFile('no version %d for filename %r' % (version, filename))
+            skip = version
+            sort = _SORT_ASCENDING
+        docs = await self.__files.find(query).limit(1).skip(skip).sort(
+            sort).to_list()
+        if not docs:
+            raise NoFile('no version %d for filename %r' % (version, filename))
+        return GridOut(self.__collection, file_document=docs[0],
+                       prefetch=True)
 
     async def get_last_version(self, filename=None, **kwargs) -> GridOut:
         """Get the most recent version of a file in GridFS by ``"filename"``
@@ -142,7 +354,8 @@ class GridFS:
         """
         return await self.get_version(filename=filename, **kwargs)
 
-    async def delete(self, file_id: Any) -> None:
+    async def delete(self, file_id: Any,
+                     chunks_write_concern: Optional[WriteConcern] = None) -> None:
         """Delete a file from GridFS by ``"_id"``.
 
         Deletes all data belonging to the file with ``"_id"``:
@@ -151,26 +364,122 @@ class GridFS:
         .. warning:: Any processes/threads reading from the file while
            this method is executing will likely see an invalid/corrupt
            file. Care should be taken to avoid concurrent reads to a file
-           while it is being deleted.
+           while it is being deleted. The ``files`` and ``chunks`` deletes
+           are sent concurrently, so a reader may also observe the file
+           document without its chunks or vice versa.
 
         .. note:: Deletes of non-existent files are considered successful
            since the end result is the same: no file with that _id remains.
 
         :Parameters:
           - `file_id`: ``"_id"`` of the file to delete
+          - `chunks_write_concern` (optional): an instance of
+            :class:`~pymongo.write_concern.WriteConcern` to use for the
+            chunks delete instead of the collection's. Once the ``files``
+            document is gone the chunks can no longer be found, so bulk
+            cleanup jobs may pass ``WriteConcern(w=0)`` to not wait for
+            the chunks delete to be acknowledged.
         """
-        await self.__files.delete_one({'_id': file_id})
+        self.__cache_evict([file_id])
+        chunks = self.__chunks
+        if chunks_write_concern is not None:
+            chunks = chunks.with_options(write_concern=chunks_write_concern)
+        await asyncio.gather(
+            self.__files.delete_one({'_id': file_id}),
+            chunks.delete_many({'files_id': file_id}),
+            loop=self.__collection.database.client.loop
+        )
+
+    async def delete_return(self, file_id: Any) -> Optional[dict]:
+        """Delete a file from GridFS by ``"_id"`` and return its
+        ``files`` document.
+
+        Like :meth:`delete`, but the ``files`` document is removed with
+        ``findAndModify``, so callers that need the file's metadata
+        don't have to :meth:`get` it first. The chunks are deleted once
+        the ``files`` document is gone. Returns ``None`` if there was no
+        such file.
+
+        :Parameters:
+          - `file_id`: ``"_id"`` of the file to delete
+        """
+        self.__cache_evict([file_id])
+        doc = await self.__files.find_one_and_delete({'_id': file_id})
         await self.__chunks.delete_many({'files_id': file_id})
+        return doc
+
+    async def delete_many(self, file_ids: List[Any]) -> None:
+        """Delete several files from GridFS by ``"_id"``.
+
+        Equivalent to calling :meth:`delete` for every id in `file_ids`,
+        but issues a single delete command per collection, and the
+        ``files`` and ``chunks`` deletes are sent concurrently.
 
-    async def list(self) -> List:
+        .. warning:: The same caveat as for :meth:`delete` applies:
+           concurrent readers of these files will likely see
+           invalid/corrupt data.
+
+        :Parameters:
+          - `file_ids`: list of ``"_id"`` values of the files to delete
+        """
+        self.__cache_evict(file_ids)
+        await asyncio.gather(
+            self.__files.delete_many({'_id': {'$in': file_ids}}),
+            self.__chunks.delete_many({'files_id': {'$in': file_ids}}),
+            loop=self.__collection.database.client.loop
+        )
+
+    async def list(self, batch_size: int = 1000) -> List:
         """List the names of all files stored in this instance of
         :class:`GridFS`.
+
+        The names are collected with an aggregation rather than
+        ``distinct``, so the server returns them in batches instead of
+        as a single reply document bounded by the maximum BSON size.
+
+        :Parameters:
+          - `batch_size` (optional): the number of names to return per
+            batch from the server
+        """
+        names = []
+        async with await self.iter_filenames(batch_size) as cursor:
+            async for name in cursor:
+                names.append(name)
+        return names
+
+    async def contains(self, filename: str) -> bool:
+        """Check if a file named `filename` is stored in this instance of
+        :class:`GridFS`.
+
+        A much cheaper alternative to ``filename in await fs.list()``:
+        the server stops counting at the first matching file.
+
+        :Parameters:
+          - `filename`: ``"filename"`` of the file to look for
+        """
+        return bool(await self.__files.count({'filename': filename}, limit=1))
+
+    async def iter_filenames(self, batch_size: int = 1000) -> _FilenameCursor:
+        """Get a cursor over the names of all files stored in this
+        instance of :class:`GridFS`.
+
+        Unlike :meth:`list`, the names are not collected into a list
+        first::
+
+          async with await fs.iter_filenames() as cursor:
+              async for name in cursor:
+                  print(name)
+
+        :Parameters:
+          - `batch_size` (optional): the number of names to return per
+            batch from the server
         """
-        # With an index, distinct includes documents with no filename
-        # as None.
-        return [
-            name for name in await self.__files.distinct('filename')
-            if name is not None]
+        pipeline = [
+            {'$match': {'filename': {'$ne': None}}},
+            {'$group': {'_id': '$filename'}}
+        ]
+        cursor = await self.__files.aggregate(pipeline, batchSize=batch_size)
+        return _FilenameCursor(cursor)
 
     async def find_one(self, filter=None, *args, **kwargs) -> Optional[GridOut]:
         """Get a single file from gridfs.
@@ -194,7 +503,8 @@ class GridFS:
         if filter is not None and not isinstance(filter, Mapping):
             filter = {'_id': filter}
 
-        async for f in self.find(filter, *args, **kwargs):
+        # A single batch of one; the server closes the cursor.
+        async for f in self.find(filter, *args, **kwargs).limit(-1):
             return f
 
         return None
@@ -242,6 +552,11 @@ class GridFS:
           - `sort` (optional): a list of (key, direction) pairs
             specifying the sort order for this query. See
             :meth:`~pymongo.cursor.Cursor.sort` for details.
+          - `batch_size` (optional): the number of files documents to
+            fetch per batch. Defaults to ``1000``.
+          - `prefetch` (optional): if True (the default), the returned
+            :class:`~gridfs.grid_file.GridOut` objects request the next
+            batch of chunks while the current one is being read.
 
         Raises :class:`TypeError` if any of the arguments are of
         improper type. Returns an instance of
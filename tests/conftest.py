@@ -1,6 +1,9 @@
+import asyncio
 import os
+from types import SimpleNamespace
 
 import pytest
+from pymongo.operations import DeleteMany, InsertOne
 
 import aiomongo
 from tests.version import Version
@@ -8,19 +11,59 @@ from tests.version import Version
 
 HOST = os.getenv('MONGO_HOST', 'localhost')
 PORT = int(os.getenv('MONGO_PORT', 27017))
+# Requests are multiplexed over each connection, so concurrent operations
+# don't need more than one; every connection is opened for every test.
+POOL_SIZE = int(os.getenv('MONGO_POOL_SIZE', 1))
+
+
+def connection_string():
+    # Every pytest-xdist worker gets its own database, since test_db drops it.
+    db_name = 'aiomongo_test'
+    worker = os.getenv('PYTEST_XDIST_WORKER')
+    if worker:
+        db_name += '_' + worker
+    return 'mongodb://{}:{}/{}?maxpoolsize={}'.format(
+        HOST, PORT, db_name, POOL_SIZE)
 
 
 @pytest.fixture(scope='function')
 def mongo(event_loop):
-    conn_string = 'mongodb://{}:{}/aiomongo_test?maxpoolsize=1'.format(HOST, PORT)
     client = event_loop.run_until_complete(
-        aiomongo.create_client(conn_string, event_loop)
+        aiomongo.create_client(connection_string(), event_loop)
     )
     yield client
     client.close()
     event_loop.run_until_complete(client.wait_closed())
 
 
+@pytest.fixture(scope='session')
+def mongo_limits():
+    """Server size limits, read once over a short-lived client."""
+    loop = asyncio.new_event_loop()
+    try:
+        client = loop.run_until_complete(
+            aiomongo.create_client(connection_string(), loop)
+        )
+        try:
+            connection = loop.run_until_complete(client.get_connection())
+            return SimpleNamespace(
+                max_bson_size=connection.max_bson_size,
+                max_message_size=connection.max_message_size,
+                max_write_batch_size=connection.max_write_batch_size)
+        finally:
+            client.close()
+            loop.run_until_complete(client.wait_closed())
+    finally:
+        loop.close()
+
+
+@pytest.fixture(scope='session')
+def big_payload(mongo_limits):
+    """Strings of max_bson_size and max_bson_size - 37 characters."""
+    max_bson_size = mongo_limits.max_bson_size
+    return 'x' * max_bson_size, 'a' * (max_bson_size - 37)
+
+
 @pytest.fixture(scope='function')
 def test_db(event_loop, mongo):
     db = mongo.get_default_database()
@@ -29,16 +72,28 @@ def test_db(event_loop, mongo):
 
 
 @pytest.fixture(scope='function')
-def test_coll(event_loop, test_db):
-    coll = test_db.test
-    event_loop.run_until_complete(coll.drop())
-    return coll
+def test_coll(test_db):
+    # test_db has just dropped the whole database.
+    return test_db.test
+
+
+@pytest.fixture(scope='function')
+def unique_a_coll(event_loop, test_coll):
+    event_loop.run_until_complete(test_coll.create_index('a', unique=True))
+    return test_coll
+
+
+@pytest.fixture(scope='function')
+def reset_coll(test_coll):
+    async def reset(n=2):
+        # Ordered, so that the delete can't run after the inserts.
+        await test_coll.bulk_write(
+            [DeleteMany({})] + [InsertOne({}) for _ in range(n)])
+    return reset
 
 
 @pytest.fixture(scope='function')
-def test_fs(event_loop, test_db):
-    event_loop.run_until_complete(test_db.drop_collection('fs.files'))
-    event_loop.run_until_complete(test_db.drop_collection('fs.chunks'))
+def test_fs(test_db):
     return aiomongo.GridFS(test_db)
 
 
@@ -1,4 +1,6 @@
+import asyncio
 import pytest
+from types import MappingProxyType
 from bson.objectid import ObjectId
 from bson.son import SON
 from pymongo.bulk import BulkWriteError
@@ -7,30 +9,61 @@ from pymongo.operations import *
 
 from tests.utils import oid_generated_on_client
 
+# Passes client-side checks (first key is an operator) but is rejected by
+# the server.
+_BAD_UPDATE = SON([('$set', {'x': 1}), ('y', 1)])
+_Z_VALIDATOR = {'z': {'$gte': 0}}
+_BIG_4MIB = 'x' * (4 << 20)
+
+# Fields of a bulk result compared by plain equality.
+_SCALAR_KEYS = frozenset(['nMatched', 'nModified', 'nUpserted', 'nInserted',
+                          'nRemoved', 'writeConcernErrors'])
+
+_EXPECT_NOTHING = MappingProxyType({
+    'nMatched': 0,
+    'nModified': 0,
+    'nUpserted': 0,
+    'nInserted': 0,
+    'nRemoved': 0,
+    'upserted': [],
+    'writeErrors': [],
+    'writeConcernErrors': []
+})
+_EXPECT_INSERTED_1 = MappingProxyType(dict(_EXPECT_NOTHING, nInserted=1))
+_EXPECT_MATCHED_1 = MappingProxyType(
+    dict(_EXPECT_NOTHING, nMatched=1, nModified=1))
+_EXPECT_MATCHED_2 = MappingProxyType(
+    dict(_EXPECT_NOTHING, nMatched=2, nModified=2))
+_EXPECT_REMOVED_1 = MappingProxyType(dict(_EXPECT_NOTHING, nRemoved=1))
+_EXPECT_REMOVED_2 = MappingProxyType(dict(_EXPECT_NOTHING, nRemoved=2))
+
 
 def assert_equal_response(expected, actual):
     """Compare response from bulk.execute() to expected response."""
-    for key, value in expected.items():
-        if key == 'nModified':
-            assert value == actual['nModified']
-        elif key == 'upserted':
-            expected_upserts = value
-            actual_upserts = actual['upserted']
-            assert len(expected_upserts) == len(actual_upserts)
+    # Fail on keys this function wouldn't compare.
+    assert expected.keys() <= _SCALAR_KEYS | {'upserted', 'writeErrors'}
+    scalar_keys = expected.keys() & _SCALAR_KEYS
+    if 'nModified' in scalar_keys:
+        assert 'nModified' in actual
+    assert ({key: expected[key] for key in scalar_keys} ==
+            {key: actual.get(key) for key in scalar_keys})
 
-            for e, a in zip(expected_upserts, actual_upserts):
-                assert_equal_upsert(e, a)
+    if 'upserted' in expected:
+        expected_upserts = expected['upserted']
+        actual_upserts = actual['upserted']
+        assert len(expected_upserts) == len(actual_upserts)
 
-        elif key == 'writeErrors':
-            expected_errors = value
-            actual_errors = actual['writeErrors']
-            assert len(expected_errors) == len(actual_errors)
+        for e, a in zip(expected_upserts, actual_upserts):
+            assert_equal_upsert(e, a)
 
-            for e, a in zip(expected_errors, actual_errors):
-                assert_equal_write_error(e, a)
+    if 'writeErrors' in expected:
+        expected_errors = expected['writeErrors']
+        actual_errors = {a['index']: a for a in actual['writeErrors']}
+        assert len(expected_errors) == len(actual['writeErrors'])
 
-        else:
-            assert actual.get(key) == value
+        for e in expected_errors:
+            assert e['index'] in actual_errors
+            assert_equal_write_error(e, actual_errors[e['index']])
 
 
 def assert_equal_upsert(expected, actual):
@@ -59,15 +92,17 @@ def assert_equal_write_error(expected, actual):
     else:
         assert expected['errmsg'] == actual['errmsg']
 
-    expected_op = expected['op'].copy()
-    actual_op = actual['op'].copy()
+    expected_op = expected['op']
+    actual_op = actual['op']
+    keys = set(expected_op) | set(actual_op)
     if expected_op.get('_id') == '...':
         # Unspecified _id.
         assert '_id' in actual_op
-        actual_op.pop('_id')
-        expected_op.pop('_id')
+        keys.discard('_id')
 
-    assert expected_op == actual_op
+    for key in keys:
+        assert key in expected_op and key in actual_op
+        assert expected_op[key] == actual_op[key]
 
 
 class TestBulk:
@@ -95,52 +130,32 @@ class TestBulk:
         if not mongo_version.at_least(3, 1, 9, -1):
             return pytest.skip('Not supported on this mongo version')
 
+        async def _phase(ordered, bypass):
+            if ordered:
+                bulk = test_coll.initialize_ordered_bulk_op(
+                    bypass_document_validation=bypass)
+            else:
+                bulk = test_coll.initialize_unordered_bulk_op(
+                    bypass_document_validation=bypass)
+            bulk.insert({'z': -1})
+            if bypass:
+                await bulk.execute()
+            else:
+                with pytest.raises(BulkWriteError):
+                    await bulk.execute()
+
         # Test insert
-        await test_coll.insert_one({'z': 0})
-        await test_db.command(SON([('collMod', 'test'),
-                                   ('validator', {'z': {'$gte': 0}})]))
-        bulk = test_coll.initialize_ordered_bulk_op(
-            bypass_document_validation=False)
-        bulk.insert({'z': -1}) # error
-        with pytest.raises(BulkWriteError):
-            await bulk.execute()
-        assert 0 == await test_coll.count({'z': -1})
-
-        bulk = test_coll.initialize_ordered_bulk_op(
-            bypass_document_validation=True)
-        bulk.insert({'z': -1})
-        await bulk.execute()
-        assert 1 == await test_coll.count({'z': -1})
-
-        await test_coll.insert_one({'z': 0})
-        await test_db.command(SON([('collMod', 'test'),
-                                   ('validator', {'z': {'$gte': 0}})]))
-        bulk = test_coll.initialize_unordered_bulk_op(
-            bypass_document_validation=False)
-        bulk.insert({'z': -1}) # error
-        with pytest.raises(BulkWriteError):
-            await bulk.execute()
-        assert 1 == await test_coll.count({'z': -1})
+        await test_db.command(SON([('create', test_coll.name),
+                                   ('validator', _Z_VALIDATOR)]))
+        await asyncio.gather(_phase(True, False), _phase(True, True))
+        await asyncio.gather(_phase(False, False), _phase(False, True))
 
-        bulk = test_coll.initialize_unordered_bulk_op(
-            bypass_document_validation=True)
-        bulk.insert({'z': -1})
-        await bulk.execute()
+        # Only the two bypassing inserts went through.
         assert 2 == await test_coll.count({'z': -1})
-        await test_coll.drop()
 
     @pytest.mark.asyncio
     async def test_insert(self, test_coll):
-        expected = {
-            'nMatched': 0,
-            'nModified': 0,
-            'nUpserted': 0,
-            'nInserted': 1,
-            'nRemoved': 0,
-            'upserted': [],
-            'writeErrors': [],
-            'writeConcernErrors': []
-        }
+        expected = _EXPECT_INSERTED_1
 
         bulk = test_coll.initialize_ordered_bulk_op()
         with pytest.raises(TypeError):
@@ -178,29 +193,23 @@ class TestBulk:
 
     @pytest.mark.asyncio
     async def test_insert_check_keys(self, test_coll):
-        bulk = test_coll.initialize_ordered_bulk_op()
+        unordered_bulk = test_coll.initialize_unordered_bulk_op
+
+        bulk = unordered_bulk()
         bulk.insert({'$dollar': 1})
         with pytest.raises(InvalidDocument):
             await bulk.execute()
 
-        bulk = test_coll.initialize_ordered_bulk_op()
+        bulk = unordered_bulk()
         bulk.insert({'a.b': 1})
         with pytest.raises(InvalidDocument):
             await bulk.execute()
 
     @pytest.mark.asyncio
-    async def test_update(self, test_coll):
+    async def test_update(self, test_coll, reset_coll):
+        unordered_bulk = test_coll.initialize_unordered_bulk_op
 
-        expected = {
-            'nMatched': 2,
-            'nModified': 2,
-            'nUpserted': 0,
-            'nInserted': 0,
-            'nRemoved': 0,
-            'upserted': [],
-            'writeErrors': [],
-            'writeConcernErrors': []
-        }
+        expected = _EXPECT_MATCHED_2
         await test_coll.insert_many([{}, {}])
 
         bulk = test_coll.initialize_ordered_bulk_op()
@@ -220,10 +229,9 @@ class TestBulk:
         bulk.find({}).update({'$set': {'foo': 'bar'}})
         result = await bulk.execute()
         assert_equal_response(expected, result)
-        assert await test_coll.find({'foo': 'bar'}).count() == 2
+        assert await test_coll.count({'foo': 'bar'}) == 2
 
-        await test_coll.delete_many({})
-        await test_coll.insert_many([{}, {}])
+        await reset_coll()
         result = await test_coll.bulk_write([UpdateMany({},
                                                   {'$set': {'foo': 'bar'}})])
         assert_equal_response(expected, result.bulk_api_result)
@@ -231,80 +239,47 @@ class TestBulk:
         assert result.modified_count in (2, None)
 
         # All fields must be $-operators -- validated server-side.
-        bulk = test_coll.initialize_ordered_bulk_op()
-        updates = SON([('$set', {'x': 1}), ('y', 1)])
-        bulk.find({}).update(updates)
+        bulk = unordered_bulk()
+        bulk.find({}).update(_BAD_UPDATE)
         with pytest.raises(BulkWriteError):
             await bulk.execute()
 
-        await test_coll.delete_many({})
-        await test_coll.insert_many([{}, {}])
+        await reset_coll()
 
-        bulk = test_coll.initialize_unordered_bulk_op()
+        bulk = unordered_bulk()
         bulk.find({}).update({'$set': {'bim': 'baz'}})
         result = await bulk.execute()
-        assert_equal_response(
-            {'nMatched': 2,
-             'nModified': 2,
-             'nUpserted': 0,
-             'nInserted': 0,
-             'nRemoved': 0,
-             'upserted': [],
-             'writeErrors': [],
-             'writeConcernErrors': []},
-            result)
+        assert_equal_response(_EXPECT_MATCHED_2, result)
 
-        assert await test_coll.find({'bim': 'baz'}).count() == 2
+        assert await test_coll.count({'bim': 'baz'}) == 2
 
         await test_coll.insert_one({'x': 1})
-        bulk = test_coll.initialize_unordered_bulk_op()
+        bulk = unordered_bulk()
         bulk.find({'x': 1}).update({'$set': {'x': 42}})
         result = await bulk.execute()
-        assert_equal_response(
-            {'nMatched': 1,
-             'nModified': 1,
-             'nUpserted': 0,
-             'nInserted': 0,
-             'nRemoved': 0,
-             'upserted': [],
-             'writeErrors': [],
-             'writeConcernErrors': []},
-            result)
+        assert_equal_response(_EXPECT_MATCHED_1, result)
 
-        assert 1 == await test_coll.find({'x': 42}).count()
+        assert 1 == await test_coll.count({'x': 42})
 
         # Second time, x is already 42 so nModified is 0.
-        bulk = test_coll.initialize_unordered_bulk_op()
+        bulk = unordered_bulk()
         bulk.find({'x': 42}).update({'$set': {'x': 42}})
         result = await bulk.execute()
-        assert_equal_response(
-            {'nMatched': 1,
-             'nModified': 0,
-             'nUpserted': 0,
-             'nInserted': 0,
-             'nRemoved': 0,
-             'upserted': [],
-             'writeErrors': [],
-             'writeConcernErrors': []},
-            result)
+        assert_equal_response(dict(_EXPECT_MATCHED_1, nModified=0), result)
 
     @pytest.mark.asyncio
-    async def test_update_one(self, test_coll):
+    @pytest.mark.parametrize('ordered', [True, False])
+    async def test_update_one(self, test_coll, reset_coll, ordered):
+        if ordered:
+            new_bulk = test_coll.initialize_ordered_bulk_op
+        else:
+            new_bulk = test_coll.initialize_unordered_bulk_op
 
-        expected = {
-            'nMatched': 1,
-            'nModified': 1,
-            'nUpserted': 0,
-            'nInserted': 0,
-            'nRemoved': 0,
-            'upserted': [],
-            'writeErrors': [],
-            'writeConcernErrors': []
-        }
+        expected = _EXPECT_MATCHED_1
 
         await test_coll.insert_many([{}, {}])
 
-        bulk = test_coll.initialize_ordered_bulk_op()
+        bulk = new_bulk()
 
         # update_one() requires find() first.
         with pytest.raises(AttributeError):
@@ -320,50 +295,35 @@ class TestBulk:
         result = await bulk.execute()
         assert_equal_response(expected, result)
 
-        assert await test_coll.find({'foo': 'bar'}).count() == 1
+        assert await test_coll.count({'foo': 'bar'}) == 1
 
-        await test_coll.delete_many({})
-        await test_coll.insert_many([{}, {}])
+        await reset_coll()
         result = await test_coll.bulk_write([UpdateOne({},
-                                                 {'$set': {'foo': 'bar'}})])
+                                                 {'$set': {'foo': 'bar'}})],
+                                            ordered=ordered)
         assert_equal_response(expected, result.bulk_api_result)
         assert 1 == result.matched_count
         assert result.modified_count in (1, None)
 
-        await test_coll.delete_many({})
-        await test_coll.insert_many([{}, {}])
-
-        bulk = test_coll.initialize_unordered_bulk_op()
-        bulk.find({}).update_one({'$set': {'bim': 'baz'}})
-        result = await bulk.execute()
-        assert_equal_response(expected, result)
-
-        assert await test_coll.find({'bim': 'baz'}).count() == 1
-
         # All fields must be $-operators -- validated server-side.
-        bulk = test_coll.initialize_ordered_bulk_op()
-        updates = SON([('$set', {'x': 1}), ('y', 1)])
-        bulk.find({}).update_one(updates)
+        bulk = new_bulk()
+        bulk.find({}).update_one(_BAD_UPDATE)
         with pytest.raises(BulkWriteError):
             await bulk.execute()
 
     @pytest.mark.asyncio
-    async def test_replace_one(self, test_coll):
+    @pytest.mark.parametrize('ordered', [True, False])
+    async def test_replace_one(self, test_coll, reset_coll, ordered):
+        if ordered:
+            new_bulk = test_coll.initialize_ordered_bulk_op
+        else:
+            new_bulk = test_coll.initialize_unordered_bulk_op
 
-        expected = {
-            'nMatched': 1,
-            'nModified': 1,
-            'nUpserted': 0,
-            'nInserted': 0,
-            'nRemoved': 0,
-            'upserted': [],
-            'writeErrors': [],
-            'writeConcernErrors': []
-        }
+        expected = _EXPECT_MATCHED_1
 
         await test_coll.insert_many([{}, {}])
 
-        bulk = test_coll.initialize_ordered_bulk_op()
+        bulk = new_bulk()
         with pytest.raises(TypeError):
             bulk.find({}).replace_one(1)
         with pytest.raises(ValueError):
@@ -372,41 +332,28 @@ class TestBulk:
         result = await bulk.execute()
         assert_equal_response(expected, result)
 
-        assert await test_coll.find({'foo': 'bar'}).count() == 1
+        assert await test_coll.count({'foo': 'bar'}) == 1
 
-        await test_coll.delete_many({})
-        await test_coll.insert_many([{}, {}])
-        result = await test_coll.bulk_write([ReplaceOne({}, {'foo': 'bar'})])
+        await reset_coll()
+        result = await test_coll.bulk_write([ReplaceOne({}, {'foo': 'bar'})],
+                                            ordered=ordered)
         assert_equal_response(expected, result.bulk_api_result)
         assert 1 == result.matched_count
         assert result.modified_count in (1, None)
 
-        await test_coll.delete_many({})
-        await test_coll.insert_many([{}, {}])
-
-        bulk = test_coll.initialize_unordered_bulk_op()
-        bulk.find({}).replace_one({'bim': 'baz'})
-        result = await bulk.execute()
-        assert_equal_response(expected, result)
-
-        assert await test_coll.find({'bim': 'baz'}).count() == 1
-
     @pytest.mark.asyncio
-    async def test_remove(self, test_coll):
-        # Test removing all documents, ordered.
-        expected = {
-            'nMatched': 0,
-            'nModified': 0,
-            'nUpserted': 0,
-            'nInserted': 0,
-            'nRemoved': 2,
-            'upserted': [],
-            'writeErrors': [],
-            'writeConcernErrors': []
-        }
+    @pytest.mark.parametrize('ordered', [True, False])
+    async def test_remove(self, test_coll, ordered):
+        if ordered:
+            new_bulk = test_coll.initialize_ordered_bulk_op
+        else:
+            new_bulk = test_coll.initialize_unordered_bulk_op
+
+        # Test removing all documents.
+        expected = _EXPECT_REMOVED_2
         await test_coll.insert_many([{}, {}])
 
-        bulk = test_coll.initialize_ordered_bulk_op()
+        bulk = new_bulk()
 
         # remove() must be preceded by find().
         with pytest.raises(AttributeError):
@@ -418,92 +365,38 @@ class TestBulk:
         assert await test_coll.count() == 0
 
         await test_coll.insert_many([{}, {}])
-        result = await test_coll.bulk_write([DeleteMany({})])
+        result = await test_coll.bulk_write([DeleteMany({})], ordered=ordered)
         assert_equal_response(expected, result.bulk_api_result)
         assert 2 == result.deleted_count
 
-        # Test removing some documents, ordered.
+        # Test removing some documents.
         await test_coll.insert_many([{}, {'x': 1}, {}, {'x': 1}])
 
-        bulk = test_coll.initialize_ordered_bulk_op()
+        bulk = new_bulk()
 
         bulk.find({'x': 1}).remove()
         result = await bulk.execute()
-        assert_equal_response(
-            {'nMatched': 0,
-             'nModified': 0,
-             'nUpserted': 0,
-             'nInserted': 0,
-             'nRemoved': 2,
-             'upserted': [],
-             'writeErrors': [],
-             'writeConcernErrors': []},
-            result)
-
-        assert await test_coll.count() == 2
-        await test_coll.delete_many({})
-
-        # Test removing all documents, unordered.
-        await test_coll.insert_many([{}, {}])
-
-        bulk = test_coll.initialize_unordered_bulk_op()
-        bulk.find({}).remove()
-        result = await bulk.execute()
-        assert_equal_response(
-            {'nMatched': 0,
-             'nModified': 0,
-             'nUpserted': 0,
-             'nInserted': 0,
-             'nRemoved': 2,
-             'upserted': [],
-             'writeErrors': [],
-             'writeConcernErrors': []},
-            result)
-
-        # Test removing some documents, unordered.
-        assert await test_coll.count() == 0
-
-        await test_coll.insert_many([{}, {'x': 1}, {}, {'x': 1}])
-
-        bulk = test_coll.initialize_unordered_bulk_op()
-        bulk.find({'x': 1}).remove()
-        result = await bulk.execute()
-        assert_equal_response(
-            {'nMatched': 0,
-             'nModified': 0,
-             'nUpserted': 0,
-             'nInserted': 0,
-             'nRemoved': 2,
-             'upserted': [],
-             'writeErrors': [],
-             'writeConcernErrors': []},
-            result)
+        assert_equal_response(expected, result)
 
         assert await test_coll.count() == 2
-        await test_coll.delete_many({})
 
     @pytest.mark.asyncio
-    async def test_remove_one(self, test_coll):
+    @pytest.mark.parametrize('ordered', [True, False])
+    async def test_remove_one(self, test_coll, ordered):
+        if ordered:
+            new_bulk = test_coll.initialize_ordered_bulk_op
+        else:
+            new_bulk = test_coll.initialize_unordered_bulk_op
 
-        bulk = test_coll.initialize_ordered_bulk_op()
+        bulk = new_bulk()
 
         # remove_one() must be preceded by find().
         with pytest.raises(AttributeError):
             bulk.remove_one()
 
         # Test removing one document, empty selector.
-        # First ordered, then unordered.
         await test_coll.insert_many([{}, {}])
-        expected = {
-            'nMatched': 0,
-            'nModified': 0,
-            'nUpserted': 0,
-            'nInserted': 0,
-            'nRemoved': 1,
-            'upserted': [],
-            'writeErrors': [],
-            'writeConcernErrors': []
-        }
+        expected = _EXPECT_REMOVED_1
 
         bulk.find({}).remove_one()
         result = await bulk.execute()
@@ -512,42 +405,27 @@ class TestBulk:
         assert await test_coll.count() == 1
 
         await test_coll.insert_one({})
-        result = await test_coll.bulk_write([DeleteOne({})])
+        result = await test_coll.bulk_write([DeleteOne({})], ordered=ordered)
         assert_equal_response(expected, result.bulk_api_result)
         assert 1 == result.deleted_count
         assert await test_coll.count() == 1
 
-        await test_coll.insert_one({})
-
-        bulk = test_coll.initialize_unordered_bulk_op()
-        bulk.find({}).remove_one()
-        result = await bulk.execute()
-        assert_equal_response(expected, result)
-
-        assert await test_coll.count() == 1
-
         # Test removing one document, with a selector.
-        # First ordered, then unordered.
-        await test_coll.insert_one({'x': 1})
-
-        bulk = test_coll.initialize_ordered_bulk_op()
-        bulk.find({'x': 1}).remove_one()
-        result = await bulk.execute()
-        assert_equal_response(expected, result)
-
-        assert [{}] == await test_coll.find({}, {'_id': False}).to_list()
         await test_coll.insert_one({'x': 1})
 
-        bulk = test_coll.initialize_unordered_bulk_op()
+        bulk = new_bulk()
         bulk.find({'x': 1}).remove_one()
         result = await bulk.execute()
         assert_equal_response(expected, result)
 
-        assert [{}] == await test_coll.find({}, {'_id': False}).to_list()
+        assert 1 == await test_coll.count()
+        assert 0 == await test_coll.count({'x': {'$exists': True}})
 
     @pytest.mark.asyncio
     async def test_upsert(self, test_coll):
-        bulk = test_coll.initialize_ordered_bulk_op()
+        ordered_bulk = test_coll.initialize_ordered_bulk_op
+
+        bulk = ordered_bulk()
 
         # upsert() requires find() first.
         with pytest.raises(AttributeError):
@@ -562,13 +440,6 @@ class TestBulk:
             'upserted': [{'index': 0, '_id': '...'}]
         }
 
-        # Note, in MongoDB 2.4 the server won't return the
-        # "upserted" field unless _id is an ObjectId
-        bulk.find({}).upsert().replace_one({'foo': 'bar'})
-        result = await bulk.execute()
-        assert_equal_response(expected, result)
-
-        await test_coll.delete_many({})
         result = await test_coll.bulk_write([ReplaceOne({},
                                                   {'foo': 'bar'},
                                                   upsert=True)])
@@ -577,48 +448,31 @@ class TestBulk:
         assert 1 == len(result.upserted_ids)
         assert isinstance(result.upserted_ids.get(0), ObjectId)
 
-        assert await test_coll.find({'foo': 'bar'}).count() == 1
+        assert await test_coll.count({'foo': 'bar'}) == 1
+        await test_coll.delete_many({})
 
-        bulk = test_coll.initialize_ordered_bulk_op()
+        # Note, in MongoDB 2.4 the server won't return the
+        # "upserted" field unless _id is an ObjectId
+        bulk = ordered_bulk()
+        bulk.find({}).upsert().replace_one({'foo': 'bar'})
         bulk.find({}).upsert().update_one({'$set': {'bim': 'baz'}})
-        result = await bulk.execute()
-        assert_equal_response(
-            {'nMatched': 1,
-             'nModified': 1,
-             'nUpserted': 0,
-             'nInserted': 0,
-             'nRemoved': 0,
-             'upserted': [],
-             'writeErrors': [],
-             'writeConcernErrors': []},
-            result)
-
-        assert await test_coll.find({'bim': 'baz'}).count() == 1
-
-        bulk = test_coll.initialize_ordered_bulk_op()
         bulk.find({}).upsert().update({'$set': {'bim': 'bop'}})
         # Non-upsert, no matches.
         bulk.find({'x': 1}).update({'$set': {'x': 2}})
         result = await bulk.execute()
         assert_equal_response(
-            {'nMatched': 1,
-             'nModified': 1,
-             'nUpserted': 0,
-             'nInserted': 0,
-             'nRemoved': 0,
-             'upserted': [],
-             'writeErrors': [],
-             'writeConcernErrors': []},
+            dict(_EXPECT_MATCHED_2, nUpserted=1,
+                 upserted=[{'index': 0, '_id': '...'}]),
             result)
 
-        assert await test_coll.find({'bim': 'bop'}).count() == 1
-        assert await test_coll.find({'x': 2}).count() == 0
+        assert await test_coll.count({'foo': 'bar'}) == 1
+        assert await test_coll.count({'bim': 'bop'}) == 1
+        assert await test_coll.count({'x': 2}) == 0
 
     @pytest.mark.asyncio
-    async def test_upsert_large(self, mongo, test_coll):
-        connection = await mongo.get_connection()
-        big = 'a' * (connection.max_bson_size - 37)
-        bulk = test_coll.initialize_ordered_bulk_op()
+    async def test_upsert_large(self, big_payload, test_coll):
+        _, big = big_payload
+        bulk = test_coll.initialize_unordered_bulk_op()
         bulk.find({'x': 1}).upsert().update({'$set': {'s': big}})
         result = await bulk.execute()
         assert_equal_response(
@@ -630,11 +484,11 @@ class TestBulk:
              'upserted': [{'index': 0, '_id': '...'}]},
             result)
 
-        assert 1 == await test_coll.find({'x': 1}).count()
+        assert 1 == await test_coll.count({'x': 1})
 
     @pytest.mark.asyncio
     async def test_client_generated_upsert_id(self, test_coll):
-        batch = test_coll.initialize_ordered_bulk_op()
+        batch = test_coll.initialize_unordered_bulk_op()
         batch.find({'_id': 0}).upsert().update_one({'$set': {'a': 0}})
         batch.find({'a': 1}).upsert().replace_one({'_id': 1})
         batch.find({'_id': 2}).upsert().replace_one({'_id': 2})
@@ -651,8 +505,12 @@ class TestBulk:
             result)
 
     @pytest.mark.asyncio
-    async def test_single_ordered_batch(self, test_coll):
-        batch = test_coll.initialize_ordered_bulk_op()
+    @pytest.mark.parametrize('ordered', [True, False])
+    async def test_single_batch(self, test_coll, ordered):
+        if ordered:
+            batch = test_coll.initialize_ordered_bulk_op()
+        else:
+            batch = test_coll.initialize_unordered_bulk_op()
         batch.insert({'a': 1})
         batch.find({'a': 1}).update_one({'$set': {'b': 1}})
         batch.find({'a': 2}).upsert().update_one({'$set': {'b': 2}})
@@ -665,195 +523,162 @@ class TestBulk:
              'nUpserted': 1,
              'nInserted': 2,
              'nRemoved': 1,
-             'upserted': [{'index': 2, '_id': '...'}]},
+             'upserted': [{'index': 2, '_id': '...'}],
+             'writeErrors': [],
+             'writeConcernErrors': []},
             result)
 
     @pytest.mark.asyncio
-    async def test_single_error_ordered_batch(self, test_coll):
-        await test_coll.create_index('a', unique=True)
+    async def test_single_error_ordered_batch(self, unique_a_coll):
+        batch = unique_a_coll.initialize_ordered_bulk_op()
+        batch.insert({'b': 1, 'a': 1})
+        batch.find({'b': 2}).upsert().update_one({'$set': {'a': 1}})
+        batch.insert({'b': 3, 'a': 2})
+
         try:
-            batch = test_coll.initialize_ordered_bulk_op()
-            batch.insert({'b': 1, 'a': 1})
-            batch.find({'b': 2}).upsert().update_one({'$set': {'a': 1}})
-            batch.insert({'b': 3, 'a': 2})
-
-            try:
-                await batch.execute()
-            except BulkWriteError as exc:
-                result = exc.details
-                assert exc.code == 65
-            else:
-                pytest.fail('Error not raised')
-
-            assert_equal_response(
-                {'nMatched': 0,
-                 'nModified': 0,
-                 'nUpserted': 0,
-                 'nInserted': 1,
-                 'nRemoved': 0,
-                 'upserted': [],
-                 'writeConcernErrors': [],
-                 'writeErrors': [
-                     {'index': 1,
-                      'code': 11000,
-                      'errmsg': '...',
-                      'op': {'q': {'b': 2},
-                             'u': {'$set': {'a': 1}},
-                             'multi': False,
-                             'upsert': True}}]},
-                result)
-        finally:
-            await test_coll.drop_index([('a', 1)])
+            await batch.execute()
+        except BulkWriteError as exc:
+            result = exc.details
+            assert exc.code == 65
+        else:
+            pytest.fail('Error not raised')
+
+        assert_equal_response(
+            {'nMatched': 0,
+             'nModified': 0,
+             'nUpserted': 0,
+             'nInserted': 1,
+             'nRemoved': 0,
+             'upserted': [],
+             'writeConcernErrors': [],
+             'writeErrors': [
+                 {'index': 1,
+                  'code': 11000,
+                  'errmsg': '...',
+                  'op': {'q': {'b': 2},
+                         'u': {'$set': {'a': 1}},
+                         'multi': False,
+                         'upsert': True}}]},
+            result)
 
     @pytest.mark.asyncio
-    async def test_multiple_error_ordered_batch(self, test_coll):
-        await test_coll.create_index('a', unique=True)
+    async def test_multiple_error_ordered_batch(self, unique_a_coll):
+        batch = unique_a_coll.initialize_ordered_bulk_op()
+        batch.insert({'b': 1, 'a': 1})
+        batch.find({'b': 2}).upsert().update_one({'$set': {'a': 1}})
+        batch.find({'b': 3}).upsert().update_one({'$set': {'a': 2}})
+        batch.find({'b': 2}).upsert().update_one({'$set': {'a': 1}})
+        batch.insert({'b': 4, 'a': 3})
+        batch.insert({'b': 5, 'a': 1})
+
         try:
-            batch = test_coll.initialize_ordered_bulk_op()
-            batch.insert({'b': 1, 'a': 1})
-            batch.find({'b': 2}).upsert().update_one({'$set': {'a': 1}})
-            batch.find({'b': 3}).upsert().update_one({'$set': {'a': 2}})
-            batch.find({'b': 2}).upsert().update_one({'$set': {'a': 1}})
-            batch.insert({'b': 4, 'a': 3})
-            batch.insert({'b': 5, 'a': 1})
-
-            try:
-                await batch.execute()
-            except BulkWriteError as exc:
-                result = exc.details
-                assert exc.code == 65
-            else:
-                pytest.fail('Error not raised')
-
-            assert_equal_response(
-                {'nMatched': 0,
-                 'nModified': 0,
-                 'nUpserted': 0,
-                 'nInserted': 1,
-                 'nRemoved': 0,
-                 'upserted': [],
-                 'writeConcernErrors': [],
-                 'writeErrors': [
-                     {'index': 1,
-                      'code': 11000,
-                      'errmsg': '...',
-                      'op': {'q': {'b': 2},
-                             'u': {'$set': {'a': 1}},
-                             'multi': False,
-                             'upsert': True}}]},
-                result)
-        finally:
-            await test_coll.drop_index([('a', 1)])
+            await batch.execute()
+        except BulkWriteError as exc:
+            result = exc.details
+            assert exc.code == 65
+        else:
+            pytest.fail('Error not raised')
 
-    @pytest.mark.asyncio
-    async def test_single_unordered_batch(self, test_coll):
-        batch = test_coll.initialize_unordered_bulk_op()
-        batch.insert({'a': 1})
-        batch.find({'a': 1}).update_one({'$set': {'b': 1}})
-        batch.find({'a': 2}).upsert().update_one({'$set': {'b': 2}})
-        batch.insert({'a': 3})
-        batch.find({'a': 3}).remove()
-        result = await batch.execute()
         assert_equal_response(
-            {'nMatched': 1,
-             'nModified': 1,
-             'nUpserted': 1,
-             'nInserted': 2,
-             'nRemoved': 1,
-             'upserted': [{'index': 2, '_id': '...'}],
-             'writeErrors': [],
-             'writeConcernErrors': []},
+            {'nMatched': 0,
+             'nModified': 0,
+             'nUpserted': 0,
+             'nInserted': 1,
+             'nRemoved': 0,
+             'upserted': [],
+             'writeConcernErrors': [],
+             'writeErrors': [
+                 {'index': 1,
+                  'code': 11000,
+                  'errmsg': '...',
+                  'op': {'q': {'b': 2},
+                         'u': {'$set': {'a': 1}},
+                         'multi': False,
+                         'upsert': True}}]},
             result)
 
     @pytest.mark.asyncio
-    async def test_single_error_unordered_batch(self, test_coll):
-        await test_coll.create_index('a', unique=True)
+    async def test_single_error_unordered_batch(self, unique_a_coll):
+        batch = unique_a_coll.initialize_unordered_bulk_op()
+        batch.insert({'b': 1, 'a': 1})
+        batch.find({'b': 2}).upsert().update_one({'$set': {'a': 1}})
+        batch.insert({'b': 3, 'a': 2})
+
         try:
-            batch = test_coll.initialize_unordered_bulk_op()
-            batch.insert({'b': 1, 'a': 1})
-            batch.find({'b': 2}).upsert().update_one({'$set': {'a': 1}})
-            batch.insert({'b': 3, 'a': 2})
-
-            try:
-                await batch.execute()
-            except BulkWriteError as exc:
-                result = exc.details
-                assert exc.code == 65
-            else:
-                pytest.fail('Error not raised')
-
-            assert_equal_response(
-                {'nMatched': 0,
-                 'nModified': 0,
-                 'nUpserted': 0,
-                 'nInserted': 2,
-                 'nRemoved': 0,
-                 'upserted': [],
-                 'writeConcernErrors': [],
-                 'writeErrors': [
-                     {'index': 1,
-                      'code': 11000,
-                      'errmsg': '...',
-                      'op': {'q': {'b': 2},
-                             'u': {'$set': {'a': 1}},
-                             'multi': False,
-                             'upsert': True}}]},
-                result)
-        finally:
-            await test_coll.drop_index([('a', 1)])
+            await batch.execute()
+        except BulkWriteError as exc:
+            result = exc.details
+            assert exc.code == 65
+        else:
+            pytest.fail('Error not raised')
+
+        assert_equal_response(
+            {'nMatched': 0,
+             'nModified': 0,
+             'nUpserted': 0,
+             'nInserted': 2,
+             'nRemoved': 0,
+             'upserted': [],
+             'writeConcernErrors': [],
+             'writeErrors': [
+                 {'index': 1,
+                  'code': 11000,
+                  'errmsg': '...',
+                  'op': {'q': {'b': 2},
+                         'u': {'$set': {'a': 1}},
+                         'multi': False,
+                         'upsert': True}}]},
+            result)
 
     @pytest.mark.asyncio
-    async def test_multiple_error_unordered_batch(self, test_coll):
-        await test_coll.create_index('a', unique=True)
+    async def test_multiple_error_unordered_batch(self, unique_a_coll):
+        batch = unique_a_coll.initialize_unordered_bulk_op()
+        batch.insert({'b': 1, 'a': 1})
+        batch.find({'b': 2}).upsert().update_one({'$set': {'a': 3}})
+        batch.find({'b': 3}).upsert().update_one({'$set': {'a': 4}})
+        batch.find({'b': 4}).upsert().update_one({'$set': {'a': 3}})
+        batch.insert({'b': 5, 'a': 2})
+        batch.insert({'b': 6, 'a': 1})
+
         try:
-            batch = test_coll.initialize_unordered_bulk_op()
-            batch.insert({'b': 1, 'a': 1})
-            batch.find({'b': 2}).upsert().update_one({'$set': {'a': 3}})
-            batch.find({'b': 3}).upsert().update_one({'$set': {'a': 4}})
-            batch.find({'b': 4}).upsert().update_one({'$set': {'a': 3}})
-            batch.insert({'b': 5, 'a': 2})
-            batch.insert({'b': 6, 'a': 1})
-
-            try:
-                await batch.execute()
-            except BulkWriteError as exc:
-                result = exc.details
-                assert exc.code == 65
-            else:
-                pytest.fail('Error not raised')
-            # Assume the update at index 1 runs before the update at index 3,
-            # although the spec does not require it. Same for inserts.
-            assert_equal_response(
-                {'nMatched': 0,
-                 'nModified': 0,
-                 'nUpserted': 2,
-                 'nInserted': 2,
-                 'nRemoved': 0,
-                 'upserted': [
-                     {'index': 1, '_id': '...'},
-                     {'index': 2, '_id': '...'}],
-                 'writeConcernErrors': [],
-                 'writeErrors': [
-                     {'index': 3,
-                      'code': 11000,
-                      'errmsg': '...',
-                      'op': {'q': {'b': 4},
-                             'u': {'$set': {'a': 3}},
-                             'multi': False,
-                             'upsert': True}},
-                     {'index': 5,
-                      'code': 11000,
-                      'errmsg': '...',
-                      'op': {'_id': '...', 'b': 6, 'a': 1}}]},
-                result)
-        finally:
-            await test_coll.drop_index([('a', 1)])
+            await batch.execute()
+        except BulkWriteError as exc:
+            result = exc.details
+            assert exc.code == 65
+        else:
+            pytest.fail('Error not raised')
+        # Assume the update at index 1 runs before the update at index 3,
+        # although the spec does not require it. Same for inserts.
+        assert_equal_response(
+            {'nMatched': 0,
+             'nModified': 0,
+             'nUpserted': 2,
+             'nInserted': 2,
+             'nRemoved': 0,
+             'upserted': [
+                 {'index': 1, '_id': '...'},
+                 {'index': 2, '_id': '...'}],
+             'writeConcernErrors': [],
+             'writeErrors': [
+                 {'index': 3,
+                  'code': 11000,
+                  'errmsg': '...',
+                  'op': {'q': {'b': 4},
+                         'u': {'$set': {'a': 3}},
+                         'multi': False,
+                         'upsert': True}},
+                 {'index': 5,
+                  'code': 11000,
+                  'errmsg': '...',
+                  'op': {'_id': '...', 'b': 6, 'a': 1}}]},
+            result)
 
     @pytest.mark.asyncio
-    async def test_large_inserts_ordered(self, mongo, test_coll):
-        connection = await mongo.get_connection()
-        big = 'x' * connection.max_bson_size
-        batch = test_coll.initialize_ordered_bulk_op()
+    async def test_large_inserts_ordered(self, big_payload, test_coll):
+        ordered_bulk = test_coll.initialize_ordered_bulk_op
+
+        big, _ = big_payload
+        batch = ordered_bulk()
         batch.insert({'b': 1, 'a': 1})
         batch.insert({'big': big})
         batch.insert({'b': 2, 'a': 2})
@@ -870,8 +695,8 @@ class TestBulk:
 
         await test_coll.delete_many({})
 
-        big = 'x' * (1024 * 1024 * 4)
-        batch = test_coll.initialize_ordered_bulk_op()
+        big = _BIG_4MIB
+        batch = ordered_bulk()
         batch.insert({'a': 1, 'big': big})
         batch.insert({'a': 2, 'big': big})
         batch.insert({'a': 3, 'big': big})
@@ -884,10 +709,11 @@ class TestBulk:
         assert 6 == await test_coll.count()
 
     @pytest.mark.asyncio
-    async def test_large_inserts_unordered(self, mongo, test_coll):
-        connection = await mongo.get_connection()
-        big = 'x' * connection.max_bson_size
-        batch = test_coll.initialize_unordered_bulk_op()
+    async def test_large_inserts_unordered(self, big_payload, test_coll):
+        unordered_bulk = test_coll.initialize_unordered_bulk_op
+
+        big, _ = big_payload
+        batch = unordered_bulk()
         batch.insert({'b': 1, 'a': 1})
         batch.insert({'big': big})
         batch.insert({'b': 2, 'a': 2})
@@ -904,8 +730,8 @@ class TestBulk:
 
         await test_coll.delete_many({})
 
-        big = 'x' * (1024 * 1024 * 4)
-        batch = test_coll.initialize_ordered_bulk_op()
+        big = _BIG_4MIB
+        batch = unordered_bulk()
         batch.insert({'a': 1, 'big': big})
         batch.insert({'a': 2, 'big': big})
         batch.insert({'a': 3, 'big': big})
@@ -922,8 +748,7 @@ class TestBulk:
         # Ensure we don't exceed server's 1000-document batch size limit.
         n_docs = 2100
         batch = test_coll.initialize_unordered_bulk_op()
-        for _ in range(n_docs):
-            batch.insert({})
+        batch.insert_many({} for _ in range(n_docs))
 
         result = await batch.execute()
         assert n_docs == result['nInserted']
@@ -932,8 +757,7 @@ class TestBulk:
         # Same with ordered bulk.
         await test_coll.delete_many({})
         batch = test_coll.initialize_ordered_bulk_op()
-        for _ in range(n_docs):
-            batch.insert({})
+        batch.insert_many({} for _ in range(n_docs))
 
         result = await batch.execute()
         assert n_docs == result['nInserted']
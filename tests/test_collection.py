@@ -585,6 +585,43 @@ class TestCollection:
         assert not result.acknowledged
         assert 20 == await db.test.count()
 
+    @pytest.mark.asyncio
+    async def test_insert_one_batched(self, test_db):
+        coll = test_db.test
+        docs = [{'_id': i} for i in range(2500)]
+        results = await asyncio.gather(
+            *[coll.insert_one_batched(doc) for doc in docs])
+        for doc, result in zip(docs, results):
+            assert isinstance(result, InsertOneResult)
+            assert doc['_id'] == result.inserted_id
+            assert result.acknowledged
+        assert 2500 == await coll.count()
+
+        results = await asyncio.gather(
+            coll.insert_one_batched({}),
+            coll.insert_one_batched({'_id': 0}),
+            coll.insert_one_batched({}),
+            return_exceptions=True)
+        assert isinstance(results[0].inserted_id, ObjectId)
+        assert isinstance(results[1], DuplicateKeyError)
+        assert isinstance(results[2].inserted_id, ObjectId)
+        assert 2502 == await coll.count()
+
+    @pytest.mark.asyncio
+    async def test_insert_one_batched_document_too_large(self, mongo, test_db):
+        connection = await mongo.get_connection()
+        large = '*' * (connection.max_bson_size + _COMMAND_OVERHEAD)
+        coll = test_db.test
+        results = await asyncio.gather(
+            coll.insert_one_batched({'_id': 1}),
+            coll.insert_one_batched({'_id': 2, 'data': large}),
+            coll.insert_one_batched({'_id': 3}),
+            return_exceptions=True)
+        assert 1 == results[0].inserted_id
+        assert isinstance(results[1], DocumentTooLarge)
+        assert 3 == results[2].inserted_id
+        assert 2 == await coll.count()
+
     @pytest.mark.asyncio
     async def test_delete_one(self, test_db):
         await test_db.test.insert_one({'x': 1})
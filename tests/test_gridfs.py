@@ -1,9 +1,20 @@
+import asyncio
 import datetime
+import hashlib
 import pytest
 from io import BytesIO
 
 from bson.binary import Binary
 from gridfs.errors import CorruptGridFile, FileExists, NoFile
+from pymongo.write_concern import WriteConcern
+
+import aiomongo
+
+
+async def _fs_counts(db):
+    """Return the number of ``fs.files`` and ``fs.chunks`` documents."""
+    return tuple(await asyncio.gather(db.fs.files.count(),
+                                      db.fs.chunks.count()))
 
 
 class TestGridFs:
@@ -12,14 +23,12 @@ class TestGridFs:
     async def test_basic(self, test_db, test_fs):
         oid = await test_fs.put(b'hello world')
         assert b'hello world' == await (await test_fs.get(oid)).read()
-        assert 1 == await test_db.fs.files.count()
-        assert 1 == await test_db.fs.chunks.count()
+        assert (1, 1) == await _fs_counts(test_db)
 
         await test_fs.delete(oid)
         with pytest.raises(NoFile):
             await test_fs.get(oid)
-        assert 0 == await test_db.fs.files.count()
-        assert 0 == await test_db.fs.chunks.count()
+        assert (0, 0) == await _fs_counts(test_db)
 
         with pytest.raises(NoFile):
             await test_fs.get('foo')
@@ -29,14 +38,66 @@ class TestGridFs:
 
     @pytest.mark.asyncio
     async def test_multi_chunk_delete(self, test_db, test_fs):
-        assert 0 == await test_db.fs.files.count()
-        assert 0 == await test_db.fs.chunks.count()
+        assert (0, 0) == await _fs_counts(test_db)
         oid = await test_fs.put(b'hello', chunkSize=1)
-        assert 1 == await test_db.fs.files.count()
-        assert 5 == await test_db.fs.chunks.count()
+        assert (1, 5) == await _fs_counts(test_db)
         await test_fs.delete(oid)
-        assert 0 == await test_db.fs.files.count()
-        assert 0 == await test_db.fs.chunks.count()
+        assert (0, 0) == await _fs_counts(test_db)
+
+    @pytest.mark.asyncio
+    async def test_delete_unacknowledged_chunks(self, test_db, test_fs):
+        oid = await test_fs.put(b'hello', chunkSize=1)
+        await test_fs.delete(oid, chunks_write_concern=WriteConcern(w=0))
+        # With a larger pool the count may overtake the unacknowledged
+        # delete on another connection; wait up to five seconds for it.
+        for _ in range(100):
+            if (0, 0) == await _fs_counts(test_db):
+                break
+            await asyncio.sleep(0.05)
+        assert (0, 0) == await _fs_counts(test_db)
+
+    @pytest.mark.asyncio
+    async def test_delete_return(self, test_db, test_fs):
+        oid = await test_fs.put(b'hello', filename='mike', chunkSize=1)
+        doc = await test_fs.delete_return(oid)
+        assert oid == doc['_id']
+        assert 'mike' == doc['filename']
+        assert (0, 0) == await _fs_counts(test_db)
+
+        assert await test_fs.delete_return(oid) is None
+
+    @pytest.mark.asyncio
+    async def test_delete_many(self, test_db, test_fs):
+        one = await test_fs.put(b'hello', chunkSize=1)
+        two = await test_fs.put(b'world', chunkSize=1)
+        three = await test_fs.put(b'!')
+        assert (3, 11) == await _fs_counts(test_db)
+
+        await test_fs.delete_many([one, two])
+        assert (1, 1) == await _fs_counts(test_db)
+        assert b'!' == await (await test_fs.get(three)).read()
+        with pytest.raises(NoFile):
+            await test_fs.get(one)
+
+    @pytest.mark.asyncio
+    async def test_get_cached(self, test_db):
+        fs = aiomongo.GridFS(test_db, cache_size=1)
+        one = await fs.put(b'hello', filename='one')
+        two = await fs.put(b'world', filename='two')
+
+        assert 'one' == (await fs.get(one)).filename
+        await test_db.fs.files.update_one({'_id': one},
+                                          {'$set': {'filename': 'uno'}})
+        assert 'one' == (await fs.get(one)).filename
+        assert b'hello' == await (await fs.get(one)).read()
+
+        # Getting another file evicts the first one.
+        assert 'two' == (await fs.get(two)).filename
+        assert 'uno' == (await fs.get(one)).filename
+
+        await fs.delete(one)
+        with pytest.raises(NoFile):
+            await fs.get(one)
 
     @pytest.mark.asyncio
     async def test_list(self, test_fs):
@@ -49,18 +110,39 @@ class TestGridFs:
         await test_fs.get_last_version()
         assert [] == await test_fs.list()
 
+        await asyncio.gather(test_fs.put(b'', filename='mike'),
+                             test_fs.put(b'foo', filename='test'),
+                             test_fs.put(b'', filename='hello world'))
+
+        assert {'mike', 'test', 'hello world'} == set(await test_fs.list())
+
+    @pytest.mark.asyncio
+    async def test_contains(self, test_fs):
+        assert not await test_fs.contains('mike')
+        await test_fs.put(b'hello', filename='mike')
+        await test_fs.put(b'world', filename='mike')
+        assert await test_fs.contains('mike')
+        assert not await test_fs.contains('test')
+
+    @pytest.mark.asyncio
+    async def test_iter_filenames(self, test_fs):
+        await test_fs.put(b'')
         await test_fs.put(b'', filename='mike')
+        await test_fs.put(b'foo', filename='mike')
         await test_fs.put(b'foo', filename='test')
-        await test_fs.put(b'', filename='hello world')
 
-        assert {'mike', 'test', 'hello world'} == set(await test_fs.list())
+        names = []
+        async with await test_fs.iter_filenames(batch_size=1) as cursor:
+            async for name in cursor:
+                names.append(name)
+        assert {'mike', 'test'} == set(names)
+        assert 2 == len(names)
 
     @pytest.mark.asyncio
     async def test_empty_file(self, test_db, test_fs):
         oid = await test_fs.put(b'')
         assert b'' == await (await test_fs.get(oid)).read()
-        assert 1 == await test_db.fs.files.count()
-        assert 0 == await test_db.fs.chunks.count()
+        assert (1, 0) == await _fs_counts(test_db)
 
         raw = await test_db.fs.files.find_one()
         assert 0 == raw['length']
@@ -69,6 +151,22 @@ class TestGridFs:
         assert 255 * 1024 == raw['chunkSize']
         assert isinstance(raw['md5'], str)
 
+    @pytest.mark.asyncio
+    async def test_md5(self, test_db, test_fs):
+        data = b'x' * (255 * 1024 * 3 + 1)
+        expected = hashlib.md5(data).hexdigest()
+
+        oid = await test_fs.put(data)
+        assert expected == (await test_db.fs.files.find_one(oid))['md5']
+
+        oid = await test_fs.put(BytesIO(data))
+        assert expected == (await test_db.fs.files.find_one(oid))['md5']
+
+        fs = aiomongo.GridFS(test_db, disable_md5=True)
+        oid = await fs.put(data)
+        assert 'md5' not in await test_db.fs.files.find_one(oid)
+        assert data == await (await fs.get(oid)).read()
+
     @pytest.mark.asyncio
     async def test_corrupt_chunk(self, test_db, test_fs):
         files_id = await test_fs.put(b'foobar')
@@ -79,12 +177,48 @@ class TestGridFs:
             with pytest.raises(CorruptGridFile):
                 await out.read()
 
-            out = await test_fs.get(files_id)
+            out = out.clone()
             with pytest.raises(CorruptGridFile):
                 await out.readline()
         finally:
             await test_fs.delete(files_id)
 
+    @pytest.mark.asyncio
+    async def test_read_file(self, test_db, test_fs):
+        oid = await test_fs.put(b'hello world', chunk_size=2)
+        assert b'hello world' == await test_fs.read_file(oid)
+
+        empty = await test_fs.put(b'')
+        assert b'' == await test_fs.read_file(empty)
+
+        with pytest.raises(NoFile):
+            await test_fs.read_file('nonexistent')
+
+        await test_db.fs.chunks.delete_one({'files_id': oid, 'n': 2})
+        with pytest.raises(CorruptGridFile):
+            await test_fs.read_file(oid)
+
+    @pytest.mark.asyncio
+    async def test_missing_chunk(self, test_db, test_fs):
+        files_id = await test_fs.put(b'hello world', chunk_size=2)
+        for prefetch in (False, True):
+            out = await test_fs.get(files_id, prefetch=prefetch, batch_size=2)
+            chunks = []
+            for _ in range(6):
+                chunks.append(await out.readchunk())
+            assert [b'he', b'll', b'o ', b'wo', b'rl', b'd'] == chunks
+            out.close()
+
+        await test_db.fs.chunks.delete_one({'files_id': files_id, 'n': 3})
+        out = await test_fs.get(files_id)
+        with pytest.raises(CorruptGridFile):
+            await out.read()
+
+        out = await test_fs.get(files_id)
+        with pytest.raises(CorruptGridFile):
+            async for _ in out:
+                pass
+
     @pytest.mark.asyncio
     async def test_put_ensures_index(self, test_db, test_fs):
         # setUp has dropped collections.
@@ -95,12 +229,38 @@ class TestGridFs:
         files = test_db.fs.files
         await test_fs.put(b'junk')
 
-        assert any(
-            info.get('key') == [('files_id', 1), ('n', 1)]
-            for info in (await chunks.index_information()).values())
-        assert any(
-            info.get('key') == [('filename', 1), ('uploadDate', 1)]
-            for info in (await files.index_information()).values())
+        chunks_info, files_info = await asyncio.gather(
+            chunks.index_information(), files.index_information())
+        assert [('files_id', 1), ('n', 1)] == chunks_info['files_id_1_n_1']['key']
+        assert ([('filename', 1), ('uploadDate', 1)] ==
+                files_info['filename_1_uploadDate_1']['key'])
+
+    @pytest.mark.asyncio
+    async def test_put_ensures_index_once(self, test_fs, monkeypatch):
+        calls = []
+        list_indexes = aiomongo.Collection.list_indexes
+        create_index = aiomongo.Collection.create_index
+
+        async def counting_list_indexes(coll, *args, **kwargs):
+            calls.append('list_indexes')
+            return await list_indexes(coll, *args, **kwargs)
+
+        async def counting_create_index(coll, *args, **kwargs):
+            calls.append('create_index')
+            return await create_index(coll, *args, **kwargs)
+
+        monkeypatch.setattr(aiomongo.Collection, 'list_indexes',
+                            counting_list_indexes)
+        monkeypatch.setattr(aiomongo.Collection, 'create_index',
+                            counting_create_index)
+
+        oid = await test_fs.put(b'junk')
+        assert calls
+        # Empty collections would otherwise be checked again.
+        await test_fs.delete(oid)
+        del calls[:]
+        await test_fs.put(b'junk')
+        assert [] == calls
 
     @pytest.mark.asyncio
     async def test_get_last_version(self, test_fs):
@@ -120,6 +280,24 @@ class TestGridFs:
         with pytest.raises(NoFile):
             await test_fs.get_last_version('test')
 
+    @pytest.mark.asyncio
+    async def test_find_prefetch(self, test_fs):
+        await test_fs.put(b'hello world', filename='test', chunk_size=2)
+        for prefetch in (False, True):
+            async for out in test_fs.find(prefetch=prefetch):
+                assert b'hello world' == await out.read()
+
+    @pytest.mark.asyncio
+    async def test_get_version_option_named_fields(self, test_fs):
+        # Keyword arguments are metadata fields, whatever their name.
+        await test_fs.put(b'foo', filename='test', batch_size=3, prefetch=1)
+        assert b'foo' == await (await test_fs.get_version(
+            'test', batch_size=3, prefetch=1)).read()
+        with pytest.raises(NoFile):
+            await test_fs.get_version('test', batch_size=4)
+        with pytest.raises(NoFile):
+            await test_fs.get_last_version('test', prefetch=2)
+
     @pytest.mark.asyncio
     async def test_get_last_version_with_metadata(self, test_fs):
         one = await test_fs.put(b'foo', filename='test', author='author')
@@ -142,8 +320,7 @@ class TestGridFs:
         with pytest.raises(NoFile):
             await test_fs.get_last_version(filename='nottest', author='author1')
 
-        await test_fs.delete(one)
-        await test_fs.delete(two)
+        await test_fs.delete_many([one, two])
 
     @pytest.mark.asyncio
     async def test_get_version(self, test_fs):
@@ -183,9 +360,7 @@ class TestGridFs:
         with pytest.raises(NoFile):
             await test_fs.get_version(filename='test', author='author1', version=2)
 
-        await test_fs.delete(one)
-        await test_fs.delete(two)
-        await test_fs.delete(three)
+        await test_fs.delete_many([one, two, three])
 
     @pytest.mark.asyncio
     async def test_put_filelike(self, test_db, test_fs):
@@ -193,6 +368,15 @@ class TestGridFs:
         assert 11 == await test_db.fs.chunks.count()
         assert b'hello world' == await (await test_fs.get(oid)).read()
 
+    @pytest.mark.asyncio
+    async def test_put_stream(self, test_db, test_fs):
+        stream = asyncio.StreamReader()
+        stream.feed_data(b'hello world')
+        stream.feed_eof()
+        oid = await test_fs.put_stream(stream, chunk_size=2)
+        assert 6 == await test_db.fs.chunks.count()
+        assert b'hello world' == await (await test_fs.get(oid)).read()
+
     @pytest.mark.asyncio
     async def test_file_exists(self, test_fs):
         oid = await test_fs.put(b'hello')
@@ -272,16 +456,12 @@ class TestGridFs:
         assert 4 == await test_fs.find().count()
         cursor = test_fs.find(
             no_cursor_timeout=False).sort('uploadDate', -1).skip(1).limit(2)
-        gout = await cursor.__anext__()
-        assert b'test1' == await gout.read()
-        cursor.rewind()
-        gout = await cursor.__anext__()
-        assert b'test1' == await gout.read()
-        gout = await cursor.__anext__()
-        assert b'test2+' == await gout.read()
-        with pytest.raises(StopAsyncIteration):
-            await cursor.__anext__()
-        await cursor.close()
+        gouts = await cursor.to_list()
+        assert 2 == len(gouts)
+        assert b'test1' == await gouts[0].read()
+        assert b'test2+' == await gouts[1].read()
+        # The results are held in memory; reading again needs no query.
+        assert b'test1' == await gouts[0].clone().read()
         with pytest.raises(TypeError):
             test_fs.find({}, {'_id': True})
 
@@ -1,8 +1,9 @@
 import os
-import struct
+
+# ObjectId stores the PID modulo 0xFFFF; it is fixed for the process.
+_PID = os.getpid() % 0xFFFF
 
 
 def oid_generated_on_client(oid):
     """Is this process's PID in this ObjectId?"""
-    pid_from_doc = struct.unpack('>H', oid.binary[7:9])[0]
-    return (os.getpid() % 0xFFFF) == pid_from_doc
+    return _PID == int.from_bytes(oid.binary[7:9], 'big')